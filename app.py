@@ -1,115 +1,110 @@
+import os
+import random
+
 import streamlit as st
 import pandas as pd
-import google.generativeai as genai
-import plotly.express as px
 
 # Import AI agents
-from data_agent import generate_warehouse_data
-from inventory_agent import perform_abc_analysis
-from slotting_agent import recommend_slotting
-from kpi_agent import calculate_kpis
-from recommendation_agent import generate_kpi_recommendations
+from kpi_agent import format_kpis
+from layout_store import LayoutStore, SORTABLE_COLUMNS
+from orchestration_utils import build_warehouse_pipeline, StageCache
+from profiling_utils import Profiler
+from reslotting_agent import wave_summary
+from snapshot_store import DEFAULT_PATH as SNAPSHOT_PATH, SnapshotStore
+from summary_agent import GeminiBackend, StubBackend, SummaryService
 
 # --- Page Configuration ---
 st.set_page_config(layout="wide", page_title="Smart Space Management")
 
 # --- Custom CSS for Aesthetics ---
-st.markdown("""
-<style>
-    /* Main header styling */
-    .main-header {
-        color: #004d40;
-        text-align: center;
-        font-weight: bold;
-        font-size: 2.5em;
-        margin-top: -20px;
-    }
-    .subheader {
-        color: #263238;
-        font-size: 1.5em;
-        font-weight: bold;
-        margin-top: 20px;
-        border-bottom: 2px solid #e0e0e0;
-        padding-bottom: 5px;
-    }
-    .section-separator {
-        margin: 40px 0;
-        border-top: 2px solid #cfd8dc;
-    }
-    /* KPI card styling */
-    .stMetric {
-        background-color: #f5f5f5;
-        border-left: 5px solid #009688;
-        padding: 15px;
-        border-radius: 8px;
-        box-shadow: 0 4px 8px rgba(0,0,0,0.05);
-    }
-    /* Button styling */
-    .stButton>button {
-        background-color: #00796b;
-        color: white;
-        font-weight: bold;
-        border-radius: 10px;
-        border: none;
-        padding: 12px 24px;
-        width: 100%;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.2);
-    }
-    .stButton>button:hover {
-        background-color: #004d40;
-    }
-    /* Agent flow boxes */
-    .agent-box {
-        background-color: #e0f2f1;
-        border-radius: 10px;
-        padding: 10px;
-        margin: 5px;
-        text-align: center;
-        border: 1px solid #009688;
-        box-shadow: 0 1px 2px rgba(0,0,0,0.1);
-    }
-    /* Custom container for data tables */
-    .data-container {
-        border: 1px solid #e0e0e0;
-        border-radius: 8px;
-        padding: 15px;
-        box-shadow: 0 4px 8px rgba(0,0,0,0.05);
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_data
+def load_css(path='style.css'):
+    # Read once per process; the markup still has to be emitted on every
+    # rerun, since Streamlit rebuilds the page each time
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), path), encoding='utf-8') as f:
+        return f"<style>\n{f.read()}</style>"
+
+st.markdown(load_css(), unsafe_allow_html=True)
 
 # --- Initial Page Load & State Management ---
-if 'df_raw' not in st.session_state:
-    st.session_state.df_raw = generate_warehouse_data()
-    st.session_state.df_analyzed = perform_abc_analysis(st.session_state.df_raw)
-    st.session_state.df_optimized = recommend_slotting(st.session_state.df_analyzed)
-    st.session_state.kpis = calculate_kpis(st.session_state.df_raw, st.session_state.df_optimized)
+# New sessions start from the same seed, so their first render is served
+# from the shared stage cache; "Refresh Data" draws a fresh one
+INITIAL_SEED = int(os.environ.get('WAREHOUSE_SEED', '42'))
+
+def new_seed():
+    return random.randrange(2**32)
+
+def plotly_express():
+    # Imported when the first chart renders rather than at startup
+    import plotly.express as px
+    return px
+
+@st.cache_resource
+def get_stage_cache():
+    # One cache for every session: stage keys hash their inputs and params,
+    # so sessions on the same seed reuse each other's results
+    return StageCache(max_entries=32)
+
+def pipeline_params():
+    seed = {'seed': st.session_state.seed}
+    return {'data': seed, 'locations': seed}
+
+def run_pipeline(targets=('reslotting', 'kpis')):
+    # Stages are cached under their inputs, so only what changed since the
+    # last run (e.g. a new seed after "Refresh Data") is recomputed. The
+    # re-slotting plan's frame carries every raw and analyzed column plus
+    # each SKU's target location and move wave, so it is the only frame kept
+    # in session state.
+    results = st.session_state.pipeline.run(targets, params=pipeline_params())
+    df_plan, moves, _ = results['reslotting']
+    if df_plan is not st.session_state.get('df_plan'):
+        # Sort indexes are rebuilt only when the layout itself changed
+        st.session_state.layout_store = LayoutStore(df_plan)
+    st.session_state.df_plan = df_plan
+    st.session_state.moves = moves
+    st.session_state.kpis = results['kpis']
+    return results
+
+# --- Instrumentation ---
+@st.cache_resource
+def get_metrics_profiler():
+    # Process-wide totals across sessions, exported in Prometheus text format
+    return Profiler(metrics_path=os.environ.get('METRICS_PATH', os.path.join('.cache', 'metrics', 'warehouse.prom')))
+
+def session_profiler():
+    # PROFILE_STAGES=slotting,kpis (or "all") runs those stages under cProfile
+    stages = os.environ.get('PROFILE_STAGES', '')
+    profile_stages = True if stages == 'all' else {name.strip() for name in stages.split(',') if name.strip()}
+    return Profiler(profile_stages=profile_stages, sink=get_metrics_profiler())
+
+if 'pipeline' not in st.session_state:
+    st.session_state.profiler = session_profiler()
+    st.session_state.pipeline = build_warehouse_pipeline(get_stage_cache(), profiler=st.session_state.profiler)
+    st.session_state.seed = INITIAL_SEED
+    run_pipeline()
     st.session_state.recommendations = {}
     st.session_state.summary = ""
+    st.session_state.summary_source = None
     st.session_state.show_results = False
 
-# --- Gemini API Configuration ---
-genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
-model = genai.GenerativeModel('gemini-1.5-flash')
-
-def generate_summary_with_gemini(kpis):
-    prompt = f"""
-    You are a data-driven AI assistant. Based on the following KPI data from a warehouse optimization run, provide a concise, bullet-point executive summary. Focus on actionable insights and key metrics.
-
-    Here are the KPI results:
-    - Storage Utilization Rate: {kpis.get('Storage_Utilization_Rate_Pct', 'N/A')}
-    - Inventory Consolidation Index: {kpis.get('Inventory_Consolidation_Index', 'N/A')}
-    - Average Pick Time: {kpis.get('Average_Pick_Time_Sec', 'N/A')}s
-    - Total SKUs: {kpis.get('Total_SKUs', 'N/A')}
-
-    **Instructions:**
-    1.  Start with a clear, one-sentence conclusion.
-    2.  Provide 3-4 bullet points highlighting the most impactful actions and metrics.
-    3.  Focus on numbers and specific outcomes rather than general statements.
-    4.  End with a call to action.
-    """
-    response = model.generate_content(prompt)
-    return response.text
+# --- Run History ---
+@st.cache_resource
+def get_snapshot_store():
+    # Every optimization run is appended here, so runs survive the session
+    # and can be compared
+    return SnapshotStore(os.environ.get('SNAPSHOT_DB', SNAPSHOT_PATH))
+
+# --- Summary Service (Gemini, or the offline stub with SUMMARY_BACKEND=stub) ---
+@st.cache_resource
+def get_summary_service():
+    # One service per process: its worker threads and prompt cache outlive
+    # reruns. Only created once a summary is needed, so startup never loads
+    # the LLM client.
+    if os.environ.get('SUMMARY_BACKEND') == 'stub':
+        backend = StubBackend(latency_sec=float(os.environ.get('SUMMARY_STUB_LATENCY', '0')))
+    else:
+        backend = GeminiBackend(st.secrets["GEMINI_API_KEY"])
+    return SummaryService(backend, cache_dir=os.path.join('.cache', 'summaries'))
 
 # --- Main App Layout ---
 st.markdown("<h1 class='main-header'>Smart Space Management</h1>", unsafe_allow_html=True)
@@ -120,65 +115,88 @@ st.write("")
 col1, col2, col3 = st.columns([1, 2, 1])
 with col2:
     if st.button("Refresh Data"):
-        st.session_state.df_raw = generate_warehouse_data()
-        st.session_state.df_analyzed = perform_abc_analysis(st.session_state.df_raw)
-        st.session_state.df_optimized = recommend_slotting(st.session_state.df_analyzed)
-        st.session_state.kpis = calculate_kpis(st.session_state.df_raw, st.session_state.df_optimized)
+        st.session_state.seed = new_seed()
+        run_pipeline()
         st.session_state.summary = ""
         st.session_state.show_results = False
         st.rerun()
 
 # --- KPI Dashboard Section ---
 st.markdown("<h2 class='subheader'>Key Performance Indicators at a Glance</h2>", unsafe_allow_html=True)
+display_kpis = format_kpis(st.session_state.kpis)
 kpi_cols = st.columns(3)
 with kpi_cols[0]:
-    st.metric("Storage Utilization Rate", st.session_state.kpis['Storage_Utilization_Rate_Pct'])
+    st.metric("Storage Utilization Rate", display_kpis['Storage_Utilization_Rate_Pct'])
 with kpi_cols[1]:
-    st.metric("Average Pick Time", st.session_state.kpis['Average_Pick_Time_Sec'] + "s")
+    st.metric("Average Pick Time", display_kpis['Average_Pick_Time_Sec'] + "s")
 with kpi_cols[2]:
-    st.metric("Inventory Consolidation Index", st.session_state.kpis['Inventory_Consolidation_Index'])
+    st.metric("Inventory Consolidation Index", display_kpis['Inventory_Consolidation_Index'])
 
 kpi_cols2 = st.columns(3)
 with kpi_cols2[0]:
-    st.metric("Slotting Accuracy", st.session_state.kpis['Slotting_Accuracy_Pct'])
+    st.metric("Slotting Accuracy", display_kpis['Slotting_Accuracy_Pct'])
 with kpi_cols2[1]:
-    st.metric("ABC Zone Efficiency", st.session_state.kpis['ABC_Zone_Efficiency_Pct'])
+    st.metric("ABC Zone Efficiency", display_kpis['ABC_Zone_Efficiency_Pct'])
 with kpi_cols2[2]:
-    st.metric("Space Cost per Unit", st.session_state.kpis['Space_Cost_Per_Unit'])
+    st.metric("Space Cost per Unit", display_kpis['Space_Cost_Per_Unit'])
 
 st.markdown("<div class='section-separator'></div>", unsafe_allow_html=True)
 
 # --- Agent Contribution Section ---
 st.markdown("<h2 class='subheader'>AI Agent Workflow</h2>", unsafe_allow_html=True)
 st.write("The following AI agents work together in a sequence to provide comprehensive optimization insights.")
-agent_cols = st.columns(11)
-with agent_cols[0]:
-    st.markdown("<div class='agent-box'>🗄️ Data Agent</div>", unsafe_allow_html=True)
-with agent_cols[1]:
-    st.markdown("<div style='text-align: center;'>➡️</div>", unsafe_allow_html=True)
-with agent_cols[2]:
-    st.markdown("<div class='agent-box'>📈 Inventory Agent</div>", unsafe_allow_html=True)
-with agent_cols[3]:
-    st.markdown("<div style='text-align: center;'>➡️</div>", unsafe_allow_html=True)
-with agent_cols[4]:
-    st.markdown("<div class='agent-box'>📍 Slotting Agent</div>", unsafe_allow_html=True)
-with agent_cols[5]:
-    st.markdown("<div style='text-align: center;'>➡️</div>", unsafe_allow_html=True)
-with agent_cols[6]:
-    st.markdown("<div class='agent-box'>📊 KPI Agent</div>", unsafe_allow_html=True)
-with agent_cols[7]:
-    st.markdown("<div style='text-align: center;'>➡️</div>", unsafe_allow_html=True)
-with agent_cols[8]:
-    st.markdown("<div class='agent-box'>🧠 Recommendation Agent</div>", unsafe_allow_html=True)
-with agent_cols[9]:
-    st.markdown("<div style='text-align: center;'>➡️</div>", unsafe_allow_html=True)
-with agent_cols[10]:
-    st.markdown("<div class='agent-box'>✍️ Gemini Model</div>", unsafe_allow_html=True)
+flow_col, profile_col = st.columns([3, 1])
+with flow_col:
+    agent_cols = st.columns(11)
+    with agent_cols[0]:
+        st.markdown("<div class='agent-box'>🗄️ Data Agent</div>", unsafe_allow_html=True)
+    with agent_cols[1]:
+        st.markdown("<div style='text-align: center;'>➡️</div>", unsafe_allow_html=True)
+    with agent_cols[2]:
+        st.markdown("<div class='agent-box'>📈 Inventory Agent</div>", unsafe_allow_html=True)
+    with agent_cols[3]:
+        st.markdown("<div style='text-align: center;'>➡️</div>", unsafe_allow_html=True)
+    with agent_cols[4]:
+        st.markdown("<div class='agent-box'>📍 Slotting Agent</div>", unsafe_allow_html=True)
+    with agent_cols[5]:
+        st.markdown("<div style='text-align: center;'>➡️</div>", unsafe_allow_html=True)
+    with agent_cols[6]:
+        st.markdown("<div class='agent-box'>📊 KPI Agent</div>", unsafe_allow_html=True)
+    with agent_cols[7]:
+        st.markdown("<div style='text-align: center;'>➡️</div>", unsafe_allow_html=True)
+    with agent_cols[8]:
+        st.markdown("<div class='agent-box'>🧠 Recommendation Agent</div>", unsafe_allow_html=True)
+    with agent_cols[9]:
+        st.markdown("<div style='text-align: center;'>➡️</div>", unsafe_allow_html=True)
+    with agent_cols[10]:
+        st.markdown("<div class='agent-box'>✍️ Gemini Model</div>", unsafe_allow_html=True)
+with profile_col:
+    profile_panel = st.empty()
+
+def render_profile_panel():
+    # Latest span per agent; refreshed after every stage of a run
+    with profile_panel.container():
+        spans = st.session_state.profiler.table()
+        if spans.empty:
+            st.caption("No agent has run in this session yet.")
+            return
+        st.caption(f"{spans['Seconds'].sum():.2f}s across agents, slowest: {spans.loc[spans['Seconds'].idxmax(), 'Stage']}. "
+                   "Cached stages keep the timing of their last computation.")
+        st.dataframe(spans.set_index('Stage'), use_container_width=True,
+                     column_config={'Seconds': st.column_config.NumberColumn(format="%.3f"),
+                                    'RSS_Delta_MB': st.column_config.NumberColumn("RSS Δ MB", format="%.1f")})
+        for name, span in st.session_state.profiler.spans.items():
+            if span.profile:
+                with st.expander(f"cProfile: {name}"):
+                    st.code(span.profile)
+
+render_profile_panel()
 st.write("")
 
 # --- Visualization Section ---
 st.markdown("<h2 class='subheader'>Visual Analysis of Inventory</h2>", unsafe_allow_html=True)
 abc_df = pd.DataFrame(st.session_state.kpis['abc_distribution'].items(), columns=['Category', 'Count'])
+px = plotly_express()
 fig = px.pie(abc_df, values='Count', names='Category', title='ABC Inventory Distribution', color_discrete_sequence=px.colors.qualitative.Pastel)
 st.plotly_chart(fig, use_container_width=True, config={'staticPlot': True})
 
@@ -187,12 +205,23 @@ st.markdown("<div class='section-separator'></div>", unsafe_allow_html=True)
 st.write("Click the button below to perform a full optimization analysis and get a detailed executive summary.")
 if st.button("Run Optimization"):
     with st.spinner("Analyzing and optimizing..."):
-        st.session_state.df_raw = generate_warehouse_data()
-        st.session_state.df_analyzed = perform_abc_analysis(st.session_state.df_raw)
-        st.session_state.df_optimized = recommend_slotting(st.session_state.df_analyzed)
-        st.session_state.kpis = calculate_kpis(st.session_state.df_raw, st.session_state.df_optimized)
-        st.session_state.recommendations = generate_kpi_recommendations(st.session_state.kpis)
-        st.session_state.summary = generate_summary_with_gemini(st.session_state.kpis)
+        run_pipeline()
+        render_profile_panel()
+        # Start the LLM request first so it overlaps the remaining stages
+        get_summary_service().submit(st.session_state.kpis)
+        results = run_pipeline(('reslotting', 'kpis', 'recommendations', 'capacity_slotting'))
+        st.session_state.recommendations = results['recommendations']
+        st.session_state.capacity_report = results['capacity_slotting'][1]
+        render_profile_panel()
+        st.session_state.summary, st.session_state.summary_source = st.session_state.profiler.call(
+            'summary', get_summary_service().summarize, st.session_state.kpis)
+        # The kpis key covers the layout and plan it was computed from, so a
+        # repeat click on an unchanged (fully cached) run saves nothing new
+        run_key = st.session_state.pipeline.stage_keys(['kpis'], params=pipeline_params())['kpis']
+        if run_key != st.session_state.get('saved_run_key'):
+            st.session_state.profiler.call('snapshot', get_snapshot_store().save_run, st.session_state.df_plan,
+                                           st.session_state.kpis, seed=st.session_state.seed, source='app')
+            st.session_state.saved_run_key = run_key
         st.session_state.show_results = True
     st.success("Optimization analysis complete!")
     st.rerun()
@@ -211,25 +240,107 @@ if st.session_state.show_results:
 
     # 2. Optimized Warehouse Layout (Table)
     st.markdown("<h2 class='subheader'>Optimized Warehouse Layout Recommendations</h2>", unsafe_allow_html=True)
-    st.write("This table shows the precise relocation plan for each product.")
+    st.write("This table shows the precise relocation plan for each product: its target zone, new location and move wave "
+             "(0 if it stays put).")
+    # Filtering, sorting and paging run on the server; only the current page
+    # is sent to the browser
+    store = st.session_state.layout_store
+    filter_cols = st.columns([2, 1, 2, 1, 1])
+    with filter_cols[0]:
+        search = st.text_input("Search Product ID", key='layout_search')
+    with filter_cols[1]:
+        abc_filter = st.multiselect("ABC Category", store.options('ABC_Category'), key='layout_abc')
+    with filter_cols[2]:
+        category_filter = st.multiselect("Product Category", store.options('Product_Category'), key='layout_category')
+    with filter_cols[3]:
+        sort_by = st.selectbox("Sort by", [col for col in SORTABLE_COLUMNS if col in store.df.columns], key='layout_sort')
+    with filter_cols[4]:
+        descending = st.toggle("Descending", value=True, key='layout_desc')
+
+    page_size = 50
+    n_pages = max(1, -(-store.count(search, abc_filter, category_filter) // page_size))
+    if st.session_state.get('layout_page', 1) > n_pages:
+        # A narrower filter can leave the previous page number out of range
+        st.session_state.layout_page = 1
+    page = st.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, step=1, key='layout_page')
+    page_df, total = store.query(search, abc_filter, category_filter, sort_by=sort_by, descending=descending,
+                                 page=page - 1, page_size=page_size)
     st.markdown("<div class='data-container'>", unsafe_allow_html=True)
-    st.dataframe(st.session_state.df_optimized[['Product_ID', 'ABC_Category', 'Daily_Demand', 'Current_Location', 'New_Location']], use_container_width=True)
+    st.dataframe(page_df, use_container_width=True, hide_index=True)
     st.markdown("</div>", unsafe_allow_html=True)
+    first_row = (page - 1) * page_size + 1 if total else 0
+    st.caption(f"Rows {first_row:,}-{min(page * page_size, total):,} of {total:,} matching ({len(store):,} SKUs in total).")
+
+    # Charts from pre-aggregated data: a few hundred points at any catalogue size
+    px = plotly_express()
+    chart_cols = st.columns(2)
+    with chart_cols[0]:
+        fig_pareto = px.line(store.pareto_curve(), x='SKU_Share_Pct', y='Demand_Share_Pct', title='Demand Pareto Curve',
+                             labels={'SKU_Share_Pct': '% of SKUs (highest demand first)', 'Demand_Share_Pct': '% of total demand'})
+        st.plotly_chart(fig_pareto, use_container_width=True)
+    with chart_cols[1]:
+        fig_hist = px.bar(store.demand_histogram(), x='Demand_From', y='SKUs', color='ABC_Category', title='SKUs by Daily Demand',
+                          labels={'Demand_From': 'Daily demand'})
+        st.plotly_chart(fig_hist, use_container_width=True)
+
+    # Move list: run the waves in order; moves within a wave are independent
+    st.markdown("<h3>Move Plan</h3>", unsafe_allow_html=True)
+    moves = st.session_state.moves
+    if moves.empty:
+        st.caption("Every product is already in its target zone; nothing needs to move.")
+    else:
+        waves = wave_summary(moves)
+        move_cols = st.columns([1, 2])
+        with move_cols[0]:
+            st.dataframe(waves.set_index('Wave'), use_container_width=True,
+                         column_config={'Walk_m': st.column_config.NumberColumn("Walk m", format="%.0f"),
+                                        'Labour_Hours': st.column_config.NumberColumn("Labour h", format="%.1f")})
+        with move_cols[1]:
+            wave = st.selectbox("Wave", waves['Wave'].tolist(), key='moves_wave')
+            wave_moves = moves[moves['Wave'] == wave]
+            st.dataframe(wave_moves.head(page_size), use_container_width=True, hide_index=True)
+            st.caption(f"First {min(page_size, len(wave_moves)):,} of {len(wave_moves):,} moves in wave {wave}, in pick sequence.")
+
+    # Capacity check: the same catalogue assigned by slot volume, weight
+    # limit and travel cost (slotting_agent.optimize_slotting)
+    st.markdown("<h3>Capacity Check</h3>", unsafe_allow_html=True)
+    capacity = st.session_state.capacity_report
+    capacity_cols = st.columns(3)
+    with capacity_cols[0]:
+        st.metric("SKUs in a Fitting Slot", f"{capacity['assigned']:,}")
+    with capacity_cols[1]:
+        st.metric("SKUs to Reserve Storage", f"{capacity['reserve']:,}")
+    with capacity_cols[2]:
+        st.metric("Gap to Travel-Cost Bound", f"{capacity['gap_pct']:.2f}%")
+    st.caption("Each SKU gets at most one slot that holds its volume and weight, nearest slots to the highest demand; "
+               "SKUs that fit no free slot go to reserve storage.")
     
     st.markdown("<div class='section-separator'></div>", unsafe_allow_html=True)
 
     # 3. AI-Powered Executive Summary (Text & Graph)
     st.markdown("<h2 class='subheader'>AI-Powered Executive Summary</h2>", unsafe_allow_html=True)
+    if st.session_state.summary_source == 'fallback':
+        # The LLM missed the deadline; pick its answer up once it has landed
+        llm_summary = get_summary_service().cached(st.session_state.kpis)
+        if llm_summary is not None:
+            st.session_state.summary, st.session_state.summary_source = llm_summary, 'cache'
+        elif get_summary_service().failure(st.session_state.kpis) is not None:
+            # The request failed after the deadline; no AI summary is coming
+            st.session_state.summary_source = 'error'
     summary_cols = st.columns([2,1])
     with summary_cols[0]:
         st.markdown(st.session_state.summary)
+        if st.session_state.summary_source == 'fallback':
+            st.caption("Template summary shown while the AI summary is being generated.")
+        elif st.session_state.summary_source == 'error':
+            st.caption("Template summary: the AI summary service failed (see the server log). Run the optimization again to retry.")
 
     with summary_cols[1]:
         kpi_summary_data = {
             'Metric': ['Storage Utilization Rate', 'Average Pick Time'],
             'Value': [
-                float(st.session_state.kpis['Storage_Utilization_Rate_Pct'].replace('%', '')),
-                float(st.session_state.kpis['Average_Pick_Time_Sec'])
+                st.session_state.kpis['Storage_Utilization_Rate_Pct'],
+                st.session_state.kpis['Average_Pick_Time_Sec']
             ]
         }
         kpi_summary_df = pd.DataFrame(kpi_summary_data)
@@ -246,3 +357,29 @@ if st.session_state.show_results:
         file_name="AI_Powered_Summary.txt",
         mime="text/plain"
     )
+
+# --- Run History (persisted across sessions) ---
+history = get_snapshot_store()
+recent_runs = history.runs(limit=50)
+if not recent_runs.empty:
+    st.markdown("<div class='section-separator'></div>", unsafe_allow_html=True)
+    st.markdown("<h2 class='subheader'>Run History</h2>", unsafe_allow_html=True)
+    history_cols = st.columns([2, 1])
+    with history_cols[0]:
+        kpi_names = history.kpi_names()
+        default_kpis = [name for name in ('Average_Pick_Time_Sec', 'Storage_Utilization_Rate_Pct') if name in kpi_names]
+        trend_kpis = st.multiselect("KPIs", kpi_names, default=default_kpis, key='history_kpis')
+        if trend_kpis:
+            trend = history.kpi_trend(trend_kpis, limit=50).melt(id_vars=['run_id', 'created_at'], var_name='KPI', value_name='Value')
+            fig_trend = plotly_express().line(trend, x='run_id', y='Value', color='KPI', markers=True,
+                                              title='KPI Trend (last 50 runs)', labels={'run_id': 'Run'})
+            st.plotly_chart(fig_trend, use_container_width=True)
+    with history_cols[1]:
+        st.dataframe(recent_runs[['run_id', 'created_at', 'seed', 'n_skus']].set_index('run_id'), use_container_width=True)
+    sku = st.text_input("Where was this SKU? (Product ID)", key='history_sku').strip().upper()
+    if sku:
+        sku_history = history.product_history(sku, limit=50)
+        if sku_history.empty:
+            st.caption(f"{sku} is not in any saved run.")
+        else:
+            st.dataframe(sku_history.set_index('run_id'), use_container_width=True)
@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from orchestration_utils import build_warehouse_pipeline, StageCache
+from profiling_utils import Profiler
+from schema import apply_schema
+
+# Headless entry point: runs data -> ABC -> slotting -> KPIs -> recommendations
+# for many sites, one input file per site. Nothing here imports streamlit,
+# plotly or the LLM client, so it can run from cron or a CI job.
+INPUT_READERS = {
+    '.parquet': pd.read_parquet,
+    '.pq': pd.read_parquet,
+    '.arrow': pd.read_feather,
+    '.feather': pd.read_feather,
+    '.csv': pd.read_csv,
+    '.jsonl': lambda path: pd.read_json(path, lines=True),
+}
+LAYOUT_COLUMNS = ['Product_ID', 'Product_Category', 'ABC_Category', 'Daily_Demand', 'Current_Location', 'Target_Zone', 'New_Location',
+                  'Move_Wave']
+
+def site_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+def find_inputs(paths):
+    # Files as given; directories expand to the supported files they contain
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                if os.path.splitext(name)[1].lower() in INPUT_READERS))
+        else:
+            found.append(path)
+    names = [site_name(path) for path in found]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Several input files map to the same site name: {duplicates}")
+    return found
+
+def read_site(path):
+    reader = INPUT_READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        raise ValueError(f"Unsupported input file '{path}', expected one of {sorted(INPUT_READERS)}")
+    return apply_schema(reader(path))
+
+def read_locations(path):
+    # Location table in data_agent.generate_location_data's columns, shared by every site
+    reader = INPUT_READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        raise ValueError(f"Unsupported locations file '{path}', expected one of {sorted(INPUT_READERS)}")
+    return reader(path)
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def _write_atomic(path, write):
+    # Write then rename, so a killed worker never leaves a truncated output
+    tmp_path = f"{path}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+def _write_json(path, data):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, default=_json_default)
+    _write_atomic(path, write)
+
+def optimize_site(path, output_dir, thresholds=None, pick_orders=20_000, layout_format='parquet', locations_path=None):
+    # Runs one site and writes its outputs; returns a small summary so only
+    # a few bytes travel back from the worker
+    site = site_name(path)
+    site_dir = os.path.join(output_dir, site)
+    profiler = Profiler()
+    # Batch runs see each input once, so stage results are not cached
+    pipeline = build_warehouse_pipeline(StageCache(max_entries=0), pick_orders=pick_orders, profiler=profiler)
+    params = {'abc': {'thresholds': tuple(thresholds)}} if thresholds else {}
+
+    start = time.perf_counter()
+    df = profiler.call('read', read_site, path)
+    # Without a location table the move plan uses the location IDs in the
+    # site file; with one, it plans against its slots and the capacity-aware
+    # assignment runs too
+    locations = read_locations(locations_path) if locations_path else None
+    targets = ['slotting', 'reslotting', 'kpis', 'recommendations'] + (['capacity_slotting'] if locations is not None else [])
+    results = pipeline.run(targets, inputs={'data': df, 'locations': locations}, params=params)
+    # The layout is the plan's: each SKU's target zone, location and move wave
+    df_plan, moves, _ = results['reslotting']
+    layout = df_plan[[col for col in LAYOUT_COLUMNS if col in df_plan.columns]]
+    os.makedirs(site_dir, exist_ok=True)
+
+    if layout_format == 'parquet':
+        layout_path = os.path.join(site_dir, 'layout.parquet')
+        _write_atomic(layout_path, lambda tmp_path: layout.to_parquet(tmp_path, index=False))
+        _write_atomic(os.path.join(site_dir, 'moves.parquet'), lambda tmp_path: moves.to_parquet(tmp_path, index=False))
+    elif layout_format == 'csv':
+        layout_path = os.path.join(site_dir, 'layout.csv')
+        _write_atomic(layout_path, lambda tmp_path: layout.to_csv(tmp_path, index=False))
+        _write_atomic(os.path.join(site_dir, 'moves.csv'), lambda tmp_path: moves.to_csv(tmp_path, index=False))
+    else:
+        raise ValueError(f"Unknown layout_format '{layout_format}', expected 'parquet' or 'csv'")
+    _write_json(os.path.join(site_dir, 'kpis.json'), results['kpis'])
+    _write_json(os.path.join(site_dir, 'recommendations.json'), results['recommendations'].to_dict(orient='records'))
+    if 'capacity_slotting' in results:
+        df_capacity, capacity_report = results['capacity_slotting']
+        capacity_layout = df_capacity[['Product_ID', 'ABC_Category', 'Daily_Demand', 'New_Location', 'Travel_Cost']]
+        capacity_path = os.path.join(site_dir, f'capacity_layout.{layout_format}')
+        if layout_format == 'parquet':
+            _write_atomic(capacity_path, lambda tmp_path: capacity_layout.to_parquet(tmp_path, index=False))
+        else:
+            _write_atomic(capacity_path, lambda tmp_path: capacity_layout.to_csv(tmp_path, index=False))
+        _write_json(os.path.join(site_dir, 'capacity_report.json'), capacity_report)
+
+    return {
+        'site': site,
+        'input': path,
+        'status': 'ok',
+        'rows': int(len(df)),
+        'seconds': time.perf_counter() - start,
+        'outputs': site_dir,
+        'stages': {name: span.seconds for name, span in profiler.spans.items()},
+    }
+
+def _run_site(task):
+    path, output_dir, options = task
+    try:
+        return optimize_site(path, output_dir, **options)
+    except MemoryError:
+        return {'site': site_name(path), 'input': path, 'status': 'error', 'error': 'worker memory limit exceeded'}
+    except Exception as exc:
+        return {'site': site_name(path), 'input': path, 'status': 'error', 'error': f"{type(exc).__name__}: {exc}"}
+
+def _limit_worker_memory(max_bytes):
+    # Caps each worker's address space, so one oversized site fails with a
+    # MemoryError instead of pushing the host into swap
+    if not max_bytes:
+        return
+    try:
+        import resource
+    except ImportError:
+        return
+    resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+
+def _run_pool(tasks, workers, max_bytes, log):
+    # Returns (results, tasks lost to a broken pool)
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from concurrent.futures.process import BrokenProcessPool
+
+    results, broken = [], []
+    # One site per worker process: memory a site leaves behind (allocator
+    # fragmentation, caches) is returned to the OS before the next site
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1,
+                             initializer=_limit_worker_memory, initargs=(max_bytes,)) as executor:
+        futures = {executor.submit(_run_site, task): task for task in tasks}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except BrokenProcessPool:
+                # A worker was killed outright (e.g. by the OOM killer)
+                broken.append(futures[future])
+                continue
+            log(_status_line(results[-1]))
+    return results, broken
+
+def run_batch(paths, output_dir, workers=None, max_worker_memory_mb=None, log=print, **options):
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [(path, output_dir, options) for path in paths]
+    workers = min(workers or os.cpu_count() or 1, len(tasks)) or 1
+    max_bytes = int(max_worker_memory_mb * 1024 * 1024) if max_worker_memory_mb else None
+
+    results = []
+    if workers == 1 and not max_bytes:
+        for task in tasks:
+            results.append(_run_site(task))
+            log(_status_line(results[-1]))
+    else:
+        results, broken = _run_pool(tasks, workers, max_bytes, log)
+        # A killed worker breaks the whole pool, failing every site still in
+        # flight. Rerun those one at a time in their own pool, so only the
+        # site that actually kills its worker is reported as failed.
+        for task in broken:
+            retried, still_broken = _run_pool([task], 1, max_bytes, log)
+            for lost in still_broken:
+                retried.append({'site': site_name(lost[0]), 'input': lost[0], 'status': 'error', 'error': 'worker process died'})
+                log(_status_line(retried[-1]))
+            results += retried
+
+    results.sort(key=lambda result: result['site'])
+    _write_json(os.path.join(output_dir, 'batch_summary.json'), {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'sites': len(results),
+        'failed': sum(result['status'] != 'ok' for result in results),
+        'results': results,
+    })
+    return results
+
+def _status_line(result):
+    if result['status'] == 'ok':
+        return f"{result['site']:>24}: {result['rows']:>10,} SKUs in {result['seconds']:.2f}s"
+    return f"{result['site']:>24}: FAILED ({result['error']})"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Optimize warehouse sites headlessly, one input file per site.")
+    parser.add_argument('inputs', nargs='+', help="site files (.parquet, .arrow, .csv, .jsonl) or directories of them")
+    parser.add_argument('--output-dir', default='batch_output')
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--max-worker-memory-mb', type=float, default=None, help="address-space limit per worker")
+    parser.add_argument('--thresholds', type=float, nargs='+', default=None, help="ABC cumulative-demand thresholds, e.g. 80 95")
+    parser.add_argument('--pick-orders', type=int, default=20_000, help="orders in the pick-time simulation")
+    parser.add_argument('--layout-format', choices=['parquet', 'csv'], default='parquet')
+    parser.add_argument('--locations', default=None,
+                        help="location table (Location_ID, Volume_cm3, Max_Weight_kg, Travel_Cost, ...) for the move plan "
+                             "and the capacity-aware assignment")
+    args = parser.parse_args(argv)
+
+    paths = find_inputs(args.inputs)
+    if not paths:
+        parser.error("no input files found")
+    results = run_batch(paths, args.output_dir, args.workers, args.max_worker_memory_mb,
+                        thresholds=args.thresholds, pick_orders=args.pick_orders, layout_format=args.layout_format,
+                        locations_path=args.locations)
+    failed = [result for result in results if result['status'] != 'ok']
+    print(f"\n{len(results) - len(failed)}/{len(results)} sites optimized, outputs in {args.output_dir}")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from data_agent import generate_location_data, generate_warehouse_data
+from inventory_agent import perform_abc_analysis
+from kpi_agent import calculate_kpis
+from profiling_utils import rss_bytes
+from recommendation_agent import generate_kpi_recommendations
+from slotting_agent import optimize_slotting, recommend_slotting
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+# (SKUs, slots) for the capacity-aware optimizer; far slower per SKU than the
+# other stages, so it only runs with --optimizer
+OPTIMIZER_CASES = [(10_000, 5_000), (100_000, 50_000)]
+STAGES = ['generate', 'abc', 'slotting', 'kpis', 'recommendations']
+# Stages whose work does not depend on catalogue size are not scaling-checked
+SIZE_INDEPENDENT_STAGES = {'recommendations'}
+
+# Each stage consumes earlier stages' outputs, as in the app
+STAGE_FUNCS = {
+    'generate': lambda out, size, seed: generate_warehouse_data(size, seed=seed),
+    'abc': lambda out, size, seed: perform_abc_analysis(out['generate']),
+    'slotting': lambda out, size, seed: recommend_slotting(out['abc']),
+    'kpis': lambda out, size, seed: calculate_kpis(out['generate'], out['slotting']),
+    'recommendations': lambda out, size, seed: generate_kpi_recommendations(out['kpis']),
+}
+
+def run_size(size, repeat=3, seed=0, memory=True):
+    results = {stage: {'stage': stage, 'size': size, 'seconds': math.inf} for stage in STAGES}
+
+    # Timing passes run without tracemalloc, which would slow them down
+    for _ in range(repeat):
+        out = {}
+        for stage in STAGES:
+            start = time.perf_counter()
+            out[stage] = STAGE_FUNCS[stage](out, size, seed)
+            results[stage]['seconds'] = min(results[stage]['seconds'], time.perf_counter() - start)
+
+    if memory:
+        out = {}
+        tracemalloc.start()
+        for stage in STAGES:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            rss_before = rss_bytes()
+            out[stage] = STAGE_FUNCS[stage](out, size, seed)
+            rss_after = rss_bytes()
+            _, peak = tracemalloc.get_traced_memory()
+            results[stage]['peak_traced_bytes'] = int(peak - baseline)
+            # Resident memory the stage added (negative if it released more
+            # than it kept); ru_maxrss would only ever show the process peak
+            results[stage]['rss_delta_bytes'] = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+        tracemalloc.stop()
+    return [results[stage] for stage in STAGES]
+
+def run_benchmarks(sizes, repeat=3, seed=0, memory=True, log=print):
+    records = []
+    for size in sizes:
+        for record in run_size(size, repeat if size < 1_000_000 else 1, seed, memory):
+            records.append(record)
+            mem = f", peak {record['peak_traced_bytes'] / 1e6:,.1f} MB" if 'peak_traced_bytes' in record else ''
+            log(f"{record['stage']:>16} {size:>12,}: {record['seconds']:8.4f}s{mem}")
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+        },
+        'results': records,
+    }
+
+def run_optimizer_benchmarks(cases, seed=0, log=print):
+    # Solve time and solution quality (gap to the lower bound) per case
+    records = []
+    for n_skus, n_slots in cases:
+        df_analyzed = perform_abc_analysis(generate_warehouse_data(n_skus, seed=seed))
+        _, report = optimize_slotting(df_analyzed, generate_location_data(n_slots, seed=seed))
+        records.append({'skus': n_skus, 'slots': n_slots, 'seconds': report['elapsed_sec'], 'gap_pct': report['gap_pct'],
+                        'reserve': report['reserve'], 'blocks_greedy': report['blocks_greedy']})
+        log(f"optimize_slotting {n_skus:>10,} SKUs x {n_slots:>8,} slots: {report['elapsed_sec']:8.2f}s, "
+            f"gap {report['gap_pct']:.4f}%, {report['reserve']:,} in reserve")
+    return records
+
+# --- Regression checks ---
+def scaling_exponent(sizes, seconds):
+    # Least-squares slope of log(time) against log(size)
+    return float(np.polyfit(np.log(sizes), np.log(seconds), 1)[0])
+
+def check_regressions(report, baseline, slowdown_tolerance=0.5, min_seconds=0.05, scaling_tolerance=0.25, min_scaling_size=10_000):
+    # Returns a list of failure messages: stages more than slowdown_tolerance
+    # slower than the baseline (ignoring timings under min_seconds, which are
+    # noise), and stages whose time grows faster than linearly with size
+    failures = []
+    previous = {(r['stage'], r['size']): r for r in baseline.get('results', [])} if baseline else {}
+    for record in report['results']:
+        old = previous.get((record['stage'], record['size']))
+        if old is None or record['seconds'] < min_seconds:
+            continue
+        if record['seconds'] > old['seconds'] * (1 + slowdown_tolerance):
+            failures.append(f"{record['stage']} at {record['size']:,} SKUs: {record['seconds']:.3f}s vs baseline {old['seconds']:.3f}s")
+
+    for stage in STAGES:
+        if stage in SIZE_INDEPENDENT_STAGES:
+            continue
+        points = [(r['size'], r['seconds']) for r in report['results']
+                  if r['stage'] == stage and r['size'] >= min_scaling_size and r['seconds'] >= min_seconds]
+        if len(points) < 2:
+            continue
+        exponent = scaling_exponent(*zip(*points))
+        if exponent > 1 + scaling_tolerance:
+            failures.append(f"{stage} scales as size^{exponent:.2f} between {points[0][0]:,} and {points[-1][0]:,} SKUs")
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every agent across catalogue sizes.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3, help="timing passes per size below 1M SKUs (best is kept)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--optimizer', action='store_true', help="also benchmark optimize_slotting on OPTIMIZER_CASES")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help="baseline JSON to check for regressions")
+    parser.add_argument('--write-baseline', action='store_true', help="write the results to --baseline instead of checking")
+    parser.add_argument('--slowdown-tolerance', type=float, default=0.5)
+    parser.add_argument('--scaling-tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.repeat, args.seed, not args.no_memory)
+    if args.optimizer:
+        report['optimizer'] = run_optimizer_benchmarks(OPTIMIZER_CASES, args.seed)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.baseline and args.write_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote baseline {args.baseline}")
+        return 0
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    failures = check_regressions(report, baseline, args.slowdown_tolerance, scaling_tolerance=args.scaling_tolerance)
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
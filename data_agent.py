@@ -1,18 +1,140 @@
 import numpy as np
 import pandas as pd
 
-def generate_warehouse_data():
-    # np.random.seed(42)  <-- This line has been removed
+from schema import ITEM_TYPES, NUMERIC_DTYPES
+
+DEFAULT_CATEGORIES = ['Electronics', 'Apparel', 'Home Goods', 'Beauty', 'Groceries']
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+def _format_ids(prefix, numbers, width):
+    # Vectorized f"{prefix}{n:0{width}}"
+    return (prefix + pd.Series(numbers).astype(str).str.zfill(width)).to_numpy(dtype=object)
+
+def _category_mix(category_mix):
+    if category_mix is None:
+        return DEFAULT_CATEGORIES, None
+    if isinstance(category_mix, dict):
+        names = list(category_mix)
+        weights = np.asarray([category_mix[name] for name in names], dtype=float)
+        return names, weights / weights.sum()
+    return list(category_mix), None
+
+def _generate_chunk(start, stop, n_locations, category_mix, seed_seq):
+    rng = np.random.default_rng(seed_seq)
+    n = stop - start
+    categories, category_p = _category_mix(category_mix)
+    dims = rng.integers(10, 50, size=(3, n)).astype(NUMERIC_DTYPES['Length_cm'])
+    locations = _format_ids('LOC_', np.arange(1, n_locations + 1), 2)
     data = {
-        'Product_ID': [f'PROD_{i+1:03}' for i in range(100)],
-        'Item_Type': np.random.choice(['SKU', 'Non-SKU'], 100, p=[0.8, 0.2]),
-        'Product_Category': np.random.choice(['Electronics', 'Apparel', 'Home Goods', 'Beauty', 'Groceries'], 100),
-        'Daily_Demand': np.random.randint(1, 101, 100),
-        'Dimensions_cm': [f"{np.random.randint(10, 50)}x{np.random.randint(10, 50)}x{np.random.randint(10, 50)}" for _ in range(100)],
-        'Weight_kg': np.random.uniform(0.1, 50, 100).round(2),
-        'Current_Location': np.random.choice([f'LOC_{i+1:02}' for i in range(50)], 100)
+        'Product_ID': _format_ids('PROD_', np.arange(start + 1, stop + 1), 3),
+        'Item_Type': pd.Categorical.from_codes(rng.choice(2, n, p=[0.8, 0.2]), ITEM_TYPES),
+        'Product_Category': pd.Categorical.from_codes(rng.choice(len(categories), n, p=category_p), categories),
+        'Daily_Demand': rng.integers(1, 101, n, dtype=NUMERIC_DTYPES['Daily_Demand']),
+        'Length_cm': dims[0],
+        'Width_cm': dims[1],
+        'Height_cm': dims[2],
+        'Weight_kg': rng.uniform(0.1, 50, n).round(2).astype(NUMERIC_DTYPES['Weight_kg']),
+        'Current_Location': pd.Categorical.from_codes(rng.integers(0, n_locations, n), locations),
     }
-    return pd.DataFrame(data)
+    df = pd.DataFrame(data, index=pd.RangeIndex(start, stop))
+    if not n:
+        # Nothing to infer the string dtype from in an empty chunk
+        df['Product_ID'] = df['Product_ID'].astype(str)
+    return df
+
+def _chunk_tasks(n_products, n_locations, category_mix, seed, chunk_size):
+    # One child seed per chunk, so the output depends on the seed and chunk
+    # size only - not on how many workers produced it. An empty catalogue is
+    # still one (empty) chunk, so callers always get the full schema.
+    bounds = list(range(0, n_products, chunk_size)) or [0]
+    seeds = np.random.SeedSequence(seed).spawn(len(bounds))
+    return [
+        (start, min(start + chunk_size, n_products), n_locations, category_mix, seed_seq)
+        for start, seed_seq in zip(bounds, seeds)
+    ]
+
+def _generate_task(task):
+    return _generate_chunk(*task)
+
+def iter_warehouse_chunks(n_products=100, n_locations=50, category_mix=None, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    tasks = _chunk_tasks(n_products, n_locations, category_mix, seed, chunk_size)
+    if not workers or workers <= 1:
+        for task in tasks:
+            yield _generate_task(task)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Keep at most two chunks per worker in flight to bound memory
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for task in tasks:
+            pending.append(executor.submit(_generate_task, task))
+            if len(pending) >= 2 * workers:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+def generate_warehouse_data(n_products=100, n_locations=50, category_mix=None, seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    chunks = list(iter_warehouse_chunks(n_products, n_locations, category_mix, seed, chunk_size))
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks)
+
+# Location model: aisles of bays with several levels, dock at the front-left
+# corner. Travel cost is the walking distance in metres to the slot, plus a
+# reach penalty per level above the floor.
+AISLE_SPACING_M = 3.0
+BAY_WIDTH_M = 1.2
+LEVEL_COST_M = 2.0
+SLOT_SIZES_CM = [30, 40, 50]
+LEVEL_MAX_WEIGHT_KG = [60.0, 40.0, 25.0]
+
+def generate_location_data(n_locations=50, bays_per_aisle=20, levels=3, seed=None):
+    rng = np.random.default_rng(seed)
+    position = np.arange(n_locations)
+    level = position % levels
+    bay = (position // levels) % bays_per_aisle
+    aisle = position // (levels * bays_per_aisle)
+    x = aisle * AISLE_SPACING_M
+    y = (bay + 0.5) * BAY_WIDTH_M
+    side = rng.choice(SLOT_SIZES_CM, n_locations, p=[0.3, 0.5, 0.2])
+    return pd.DataFrame({
+        'Location_ID': _format_ids('LOC_', position + 1, 2),
+        'Aisle': aisle.astype('int32'),
+        'Bay': bay.astype('int32'),
+        'Level': level.astype('int8'),
+        'X_m': x.astype('float32'),
+        'Y_m': y.astype('float32'),
+        'Volume_cm3': (side.astype('int64') ** 3).astype('int32'),
+        'Max_Weight_kg': np.asarray(LEVEL_MAX_WEIGHT_KG, dtype='float32')[np.minimum(level, len(LEVEL_MAX_WEIGHT_KG) - 1)],
+        'Travel_Cost': (x + y + level * LEVEL_COST_M).astype('float32'),
+    })
+
+def write_warehouse_data(path, n_products, n_locations=50, category_mix=None, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, file_format='parquet'):
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ImportError("write_warehouse_data requires pyarrow (pip install pyarrow)") from exc
+
+    writer = None
+    try:
+        for chunk in iter_warehouse_chunks(n_products, n_locations, category_mix, seed, chunk_size, workers):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                if file_format == 'parquet':
+                    import pyarrow.parquet as pq
+                    writer = pq.ParquetWriter(path, table.schema)
+                elif file_format == 'arrow':
+                    import pyarrow.ipc as ipc
+                    writer = ipc.new_file(path, table.schema)
+                else:
+                    raise ValueError(f"Unknown file_format '{file_format}', expected 'parquet' or 'arrow'")
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
 
 if __name__ == '__main__':
     df = generate_warehouse_data()
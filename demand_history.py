@@ -0,0 +1,265 @@
+import json
+import mmap
+import os
+
+import numpy as np
+import pandas as pd
+
+from inventory_agent import DEFAULT_THRESHOLDS, classify_cumulative
+from schema import abc_dtype
+
+# Coefficient-of-variation thresholds: CV <= 0.5 is 'X' (steady), <= 1.0 is
+# 'Y' (variable), above is 'Z' (erratic)
+DEFAULT_XYZ_THRESHOLDS = (0.5, 1.0)
+XYZ_LABELS = ['X', 'Y', 'Z']
+DEFAULT_CHUNK_ROWS = 8192
+
+DEMAND_FILE = 'demand.npy'
+IDS_FILE = 'product_ids.npy'
+META_FILE = 'meta.json'
+
+def classify_cv(cv, thresholds=DEFAULT_XYZ_THRESHOLDS):
+    # SKUs with no demand in the window have an undefined CV and count as 'Z'
+    thresholds = np.asarray(sorted(thresholds), dtype=float)
+    if len(thresholds) >= len(XYZ_LABELS):
+        raise ValueError(f"XYZ classification takes at most {len(XYZ_LABELS) - 1} thresholds")
+    labels = XYZ_LABELS[:len(thresholds)] + XYZ_LABELS[-1:]
+    cv = np.asarray(cv, dtype=float)
+    codes = np.where(np.isnan(cv), len(thresholds), np.searchsorted(thresholds, cv, side='left'))
+    return pd.Categorical.from_codes(codes, dtype=abc_dtype(labels))
+
+def rank_classify(totals, thresholds=DEFAULT_THRESHOLDS):
+    # ABC codes for totals in their original (row) order: rank by total,
+    # highest first, and classify the cumulative share
+    order = np.argsort(-totals, kind='stable')
+    cumulative = np.cumsum(totals[order], dtype='float64')
+    grand_total = cumulative[-1] if len(cumulative) else 0.0
+    cum_pct = cumulative / grand_total * 100 if grand_total else np.full(len(order), 100.0)
+    categories = classify_cumulative(cum_pct, thresholds)
+    codes = np.empty(len(order), dtype=np.int8)
+    codes[order] = categories.codes
+    return pd.Categorical.from_codes(codes, dtype=categories.dtype)
+
+def _map_npy(path, writable=False):
+    # Maps a .npy file ourselves (rather than np.load(mmap_mode=...)) so
+    # pages can be released after each chunk: touched pages of a file
+    # mapping otherwise stay in the process RSS until it is unmapped
+    with open(path, 'r+b' if writable else 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(f)
+        offset = f.tell()
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+    return mapped, offset, np.ndarray(shape, dtype, buffer=mapped, offset=offset, order='F' if fortran_order else 'C')
+
+def rolling_windows(n_days, window, step=None):
+    # (start, end) day ranges of length `window`, every `step` days
+    step = step or window
+    return [(start, start + window) for start in range(0, n_days - window + 1, step)]
+
+class DemandHistory:
+    # SKU x day demand on disk as a float32 .npy file opened as a memory map,
+    # plus a Product_ID -> row index. Analyses read it in row chunks, so
+    # memory stays at one chunk plus per-SKU results whatever the history
+    # length: 1M SKUs x 730 days is 2.9 GB on disk and ~60 MB per chunk.
+    def __init__(self, path, mode='r'):
+        self.path = path
+        self._mmap, self._offset, self.demand = _map_npy(os.path.join(path, DEMAND_FILE), writable=mode == 'r+')
+        self.product_ids = np.load(os.path.join(path, IDS_FILE))
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self._index = None
+
+    @classmethod
+    def create(cls, path, product_ids, n_days, start_date=None):
+        # Allocates a zero-filled history; fill it with write()
+        product_ids = np.asarray(product_ids, dtype=str)
+        if len(pd.unique(product_ids)) != len(product_ids):
+            raise ValueError("product_ids must be unique")
+        os.makedirs(path, exist_ok=True)
+        # Header plus a sparse file of zeros, without mapping it
+        with open(os.path.join(path, DEMAND_FILE), 'wb') as f:
+            np.lib.format.write_array_header_1_0(f, {'descr': '<f4', 'fortran_order': False, 'shape': (len(product_ids), n_days)})
+            f.truncate(f.tell() + len(product_ids) * n_days * 4)
+        np.save(os.path.join(path, IDS_FILE), product_ids)
+        with open(os.path.join(path, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'start_date': str(pd.Timestamp(start_date).date()) if start_date is not None else None}, f)
+        return cls(path, mode='r+')
+
+    @property
+    def n_skus(self):
+        return self.demand.shape[0]
+
+    @property
+    def n_days(self):
+        return self.demand.shape[1]
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = pd.Index(self.product_ids)
+        return self._index
+
+    def rows(self, product_ids):
+        rows = self.index.get_indexer(np.asarray(product_ids, dtype=str))
+        if (rows < 0).any():
+            raise KeyError(f"Unknown Product_IDs: {np.asarray(product_ids, dtype=str)[rows < 0][:5].tolist()}")
+        return rows
+
+    def dates(self):
+        if self.meta.get('start_date') is None:
+            return None
+        return pd.date_range(self.meta['start_date'], periods=self.n_days, freq='D')
+
+    # --- Access ---
+    def write(self, values, start_row=0, start_day=0):
+        # Writes a (rows, days) block; use for bulk loads in row order
+        values = np.asarray(values, dtype='float32')
+        self.demand[start_row:start_row + values.shape[0], start_day:start_day + values.shape[1]] = values
+
+    def set_day(self, product_ids, day, values):
+        self.demand[self.rows(product_ids), day] = np.asarray(values, dtype='float32')
+
+    def series(self, product_id):
+        return np.asarray(self.demand[self.rows([product_id])[0]])
+
+    def flush(self):
+        self._mmap.flush()
+
+    def release(self, start_row=0, stop_row=None):
+        # Drops the mapped pages of these rows from the process RSS; the data
+        # stays in the OS page cache (and, if written, is kept)
+        if not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+        stop_row = self.n_skus if stop_row is None else min(stop_row, self.n_skus)
+        row_bytes = self.n_days * self.demand.itemsize
+        start = (self._offset + start_row * row_bytes) // mmap.PAGESIZE * mmap.PAGESIZE
+        stop = self._offset + stop_row * row_bytes
+        if stop > start:
+            self._mmap.madvise(mmap.MADV_DONTNEED, start, stop - start)
+
+    def _chunks(self, chunk_rows, first_day=0, last_day=None):
+        for start in range(0, self.n_skus, chunk_rows):
+            chunk = np.array(self.demand[start:start + chunk_rows, first_day:last_day], dtype='float64')
+            self.release(start, start + chunk_rows)
+            yield start, chunk
+
+    # --- Window statistics ---
+    def window_stats(self, windows, chunk_rows=DEFAULT_CHUNK_ROWS):
+        # Per-SKU total demand and coefficient of variation of daily demand
+        # for each (start, end) day window, from one pass over the file. Each
+        # chunk is turned into running sums over days, so every window costs
+        # two lookups per SKU regardless of its length.
+        windows = list(windows)
+        for start, end in windows:
+            if not 0 <= start < end <= self.n_days:
+                raise ValueError(f"Window ({start}, {end}) outside the {self.n_days}-day history")
+        # Only the days covered by some window are read
+        first_day = min(start for start, _ in windows)
+        last_day = max(end for _, end in windows)
+        starts = np.array([start for start, _ in windows]) - first_day
+        ends = np.array([end for _, end in windows]) - first_day
+        lengths = (ends - starts).astype('float64')
+
+        # float32 totals are exact for integer demand up to 16.7M per window
+        totals = np.empty((self.n_skus, len(windows)), dtype='float32')
+        cv = np.empty((self.n_skus, len(windows)), dtype='float32')
+        for row, chunk in self._chunks(chunk_rows, first_day, last_day):
+            running = np.zeros((len(chunk), last_day - first_day + 1))
+            np.cumsum(chunk, axis=1, out=running[:, 1:])
+            running_sq = np.zeros_like(running)
+            np.cumsum(chunk * chunk, axis=1, out=running_sq[:, 1:])
+
+            sums = running[:, ends] - running[:, starts]
+            mean = sums / lengths
+            var = np.maximum((running_sq[:, ends] - running_sq[:, starts]) / lengths - mean * mean, 0.0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                chunk_cv = np.where(mean > 0, np.sqrt(var) / mean, np.nan)
+            totals[row:row + len(chunk)] = sums
+            cv[row:row + len(chunk)] = chunk_cv
+        return totals, cv
+
+    # --- Classification ---
+    def analyze(self, start_day=0, end_day=None, thresholds=DEFAULT_THRESHOLDS, xyz_thresholds=DEFAULT_XYZ_THRESHOLDS,
+                chunk_rows=DEFAULT_CHUNK_ROWS):
+        # ABC (by total demand) and XYZ (by CV) for one window, per SKU
+        end_day = self.n_days if end_day is None else end_day
+        totals, cv = self.window_stats([(start_day, end_day)], chunk_rows)
+        totals, cv = totals[:, 0], cv[:, 0]
+        abc = rank_classify(totals, thresholds)
+        xyz = classify_cv(cv, xyz_thresholds)
+        return pd.DataFrame({
+            'Product_ID': self.product_ids,
+            'Window_Demand': totals,
+            'Avg_Daily_Demand': totals / (end_day - start_day),
+            'Demand_CV': cv,
+            'ABC_Category': abc,
+            'XYZ_Category': xyz,
+            'ABC_XYZ': pd.Categorical(np.char.add(abc.astype(str), xyz.astype(str))),
+        })
+
+    def rolling_classification(self, window=30, step=None, thresholds=DEFAULT_THRESHOLDS,
+                               xyz_thresholds=DEFAULT_XYZ_THRESHOLDS, chunk_rows=DEFAULT_CHUNK_ROWS):
+        # ABC and XYZ categories per rolling window: two frames indexed by
+        # Product_ID with one column per window, labelled by its start day
+        # (or start date when the history has one)
+        windows = rolling_windows(self.n_days, window, step)
+        if not windows:
+            raise ValueError(f"Window of {window} days is longer than the {self.n_days}-day history")
+        totals, cv = self.window_stats(windows, chunk_rows)
+        dates = self.dates()
+        columns = [dates[start].date() if dates is not None else start for start, _ in windows]
+        abc = pd.DataFrame({col: rank_classify(totals[:, i], thresholds) for i, col in enumerate(columns)}, index=self.index)
+        xyz = pd.DataFrame({col: classify_cv(cv[:, i], xyz_thresholds) for i, col in enumerate(columns)}, index=self.index)
+        return abc, xyz
+
+def synthesize_history(path, df, n_days=365, start_date='2024-01-01', seed=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    # Demo history around each SKU's Daily_Demand: weekly and yearly
+    # seasonality with a random phase, Poisson noise and occasional spikes
+    rng = np.random.default_rng(seed)
+    history = DemandHistory.create(path, df['Product_ID'].to_numpy(dtype=str), n_days, start_date)
+    base = df['Daily_Demand'].to_numpy(dtype='float64')
+    day = np.arange(n_days)
+    weekly = 1 + 0.2 * np.sin(2 * np.pi * day / 7)
+    for start in range(0, len(base), chunk_rows):
+        rows = slice(start, start + chunk_rows)
+        n = len(base[rows])
+        phase = rng.uniform(0, 2 * np.pi, (n, 1))
+        amplitude = rng.uniform(0, 0.8, (n, 1))
+        seasonal = 1 + amplitude * np.sin(2 * np.pi * day / 365 + phase)
+        rate = base[rows, None] * weekly * seasonal
+        spikes = rng.random((n, n_days)) < 0.01
+        demand = rng.poisson(rate * np.where(spikes, 8.0, 1.0)).astype('float32')
+        history.write(demand, start_row=start)
+        history.release(start, start + n)
+    history.flush()
+    return DemandHistory(path)
+
+if __name__ == '__main__':
+    import resource
+    import sys
+    import tempfile
+    import time
+    from data_agent import generate_warehouse_data
+
+    n_skus = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_days = int(sys.argv[2]) if len(sys.argv) > 2 else 730
+    path = os.path.join(tempfile.mkdtemp(), 'history')
+    df = generate_warehouse_data(n_skus, seed=1)
+
+    start = time.perf_counter()
+    synthesize_history(path, df, n_days, seed=0)
+    print(f"Wrote {n_skus:,} SKUs x {n_days} days ({n_skus * n_days * 4 / 1e9:.1f} GB) in {time.perf_counter() - start:.1f}s")
+
+    history = DemandHistory(path)
+    start = time.perf_counter()
+    analysis = history.analyze(n_days - 90, n_days)
+    print(f"\nLast 90 days ABC/XYZ in {time.perf_counter() - start:.1f}s:")
+    print(analysis.groupby(['ABC_Category', 'XYZ_Category'], observed=False).size().unstack())
+
+    start = time.perf_counter()
+    abc, xyz = history.rolling_classification(window=28, step=28)
+    print(f"\n{abc.shape[1]} rolling 28-day windows in {time.perf_counter() - start:.1f}s")
+    changes = (abc.apply(lambda col: col.cat.codes).diff(axis=1).iloc[:, 1:] != 0).sum(axis=1)
+    print(f"SKUs that changed ABC class between windows at least once: {(changes > 0).mean():.1%}")
+    print(f"Peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB")
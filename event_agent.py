@@ -0,0 +1,328 @@
+import bisect
+import json
+import logging
+import time
+
+import numpy as np
+
+from inventory_agent import DEFAULT_THRESHOLDS, classify_cumulative
+
+logger = logging.getLogger(__name__)
+
+# --- Fenwick tree over integer demand values ---
+class FenwickTree:
+    # Prefix sums of demand over integer demand values; plain lists are much
+    # faster than NumPy for the scalar, O(log V) updates done per event
+    def __init__(self, sums):
+        self.size = len(sums)
+        self.tree = [0] + [int(v) for v in sums]
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+
+    def add(self, value, delta):
+        i = value + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, value):
+        # Sum over demand values <= value
+        i, total = min(value + 1, self.size), 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def lower_bound(self, target_sum):
+        # Smallest value whose prefix sum reaches target_sum
+        position, remaining = 0, target_sum
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = position + step
+            if nxt <= self.size and self.tree[nxt] < remaining:
+                position = nxt
+                remaining -= self.tree[nxt]
+            step >>= 1
+        return position
+
+# --- Streaming ABC classifier ---
+class StreamingABC:
+    # Per-SKU demand kept in value buckets indexed by a Fenwick tree, so each
+    # event costs O(log V) and each batch reports only the SKUs whose ABC
+    # category actually changed. Ties in demand are ranked by arrival order
+    # (first-seen SKU first).
+    def __init__(self, product_ids=(), demand=(), thresholds=DEFAULT_THRESHOLDS):
+        self.thresholds = sorted(thresholds)
+        self.labels = list(classify_cumulative([], self.thresholds).categories)
+        self.product_ids = list(product_ids)
+        self.index = {product_id: i for i, product_id in enumerate(self.product_ids)}
+        self.demand = np.maximum(np.asarray(demand, dtype=np.int64), 0)
+        if len(self.index) != len(self.product_ids) or len(self.demand) != len(self.product_ids):
+            raise ValueError("product_ids must be unique and match demand")
+
+        # Buckets: demand value -> sorted SKU indices; values: sorted non-empty values
+        order = np.lexsort((np.arange(len(self.demand)), self.demand))
+        values, starts = np.unique(self.demand[order], return_index=True)
+        self.buckets = {int(v): list(chunk) for v, chunk in zip(values, np.split(order, starts[1:]))} if len(order) else {}
+        self.values = [int(v) for v in values]
+        size = max(64, int(self.demand.max(initial=0)) * 2)
+        self.tree = FenwickTree(np.bincount(self.demand, minlength=size) * np.arange(size, dtype=np.int64))
+        self.grand_total = int(self.demand.sum())
+
+        self.codes = self._initial_codes(order)
+
+    @classmethod
+    def from_frame(cls, df, thresholds=DEFAULT_THRESHOLDS):
+        return cls(df['Product_ID'].to_numpy(dtype=object), df['Daily_Demand'].to_numpy(), thresholds)
+
+    # --- Boundaries ---
+    def _boundaries(self):
+        # For each threshold, (value, m): SKUs above `value`, plus the first m
+        # SKUs of the `value` bucket, fall inside the cumulative band
+        bounds = []
+        for threshold in self.thresholds:
+            if self.grand_total == 0:
+                bounds.append(None)
+                continue
+            target = threshold / 100 * self.grand_total
+            value = self.tree.lower_bound(self.grand_total - target)
+            size = len(self.buckets.get(value, ()))
+            if value == 0:
+                bounds.append((0, size))
+                continue
+            above = self.grand_total - self.tree.prefix_sum(value)
+            bounds.append((value, min(size, int((target - above) // value))))
+        return bounds
+
+    def _initial_codes(self, order):
+        bounds = self._boundaries()
+        # Position of each SKU inside its demand bucket (buckets keep index order)
+        sorted_demand = self.demand[order]
+        group_start = np.r_[0, np.flatnonzero(np.diff(sorted_demand)) + 1] if len(order) else np.array([], dtype=np.int64)
+        starts = np.repeat(group_start, np.diff(np.r_[group_start, len(order)]))
+        position = np.empty(len(order), dtype=np.int64)
+        position[order] = np.arange(len(order)) - starts
+
+        codes = np.zeros(len(self.demand), dtype=np.int8)
+        for bound in bounds:
+            if bound is None:
+                codes += 1
+            else:
+                value, m = bound
+                inside = (self.demand > value) | ((self.demand == value) & (position < m))
+                codes += ~inside
+        return codes
+
+    def _code(self, i, bounds):
+        d = int(self.demand[i])
+        code = 0
+        for bound in bounds:
+            if bound is None:
+                code += 1
+                continue
+            value, m = bound
+            if d > value:
+                continue
+            if d < value or bisect.bisect_left(self.buckets[value], i) >= m:
+                code += 1
+        return code
+
+    # --- Mutation ---
+    def _add_sku(self, product_id):
+        i = len(self.product_ids)
+        self.product_ids.append(product_id)
+        self.index[product_id] = i
+        if i >= len(self.demand):
+            grown = max(64, 2 * len(self.demand))
+            self.demand = np.resize(self.demand, grown)
+            self.codes = np.resize(self.codes, grown)
+        self.demand[i] = 0
+        self.codes[i] = len(self.thresholds)
+        self._insert(i, 0)
+        return i
+
+    def _insert(self, i, value):
+        if value >= self.tree.size:
+            self._grow_tree(value)
+        bucket = self.buckets.get(value)
+        if bucket is None:
+            self.buckets[value] = [i]
+            bisect.insort(self.values, value)
+        else:
+            bisect.insort(bucket, i)
+        self.tree.add(value, value)
+        self.grand_total += value
+
+    def _remove(self, i, value):
+        bucket = self.buckets[value]
+        del bucket[bisect.bisect_left(bucket, i)]
+        if not bucket:
+            del self.buckets[value]
+            del self.values[bisect.bisect_left(self.values, value)]
+        self.tree.add(value, -value)
+        self.grand_total -= value
+
+    def _grow_tree(self, value):
+        size = max(2 * self.tree.size, value + 1)
+        sums = np.zeros(size, dtype=np.int64)
+        for v, bucket in self.buckets.items():
+            sums[v] = v * len(bucket)
+        self.tree = FenwickTree(sums)
+
+    def set_demand(self, product_id, value):
+        i = self.index.get(product_id)
+        if i is None:
+            i = self._add_sku(product_id)
+        value = max(int(value), 0)
+        old = int(self.demand[i])
+        if value != old:
+            self._remove(i, old)
+            self._insert(i, value)
+            self.demand[i] = value
+        return i
+
+    def apply_events(self, events):
+        # events: dicts with Product_ID and either event='pick' + qty (adds to
+        # demand) or event='demand' + Daily_Demand (sets it). Returns the ABC
+        # boundary crossings as (Product_ID, old_category, new_category).
+        old_bounds = self._boundaries()
+        touched = set()
+        for event in events:
+            product_id = event['Product_ID']
+            if event.get('event', 'demand') == 'pick':
+                i = self.index.get(product_id)
+                current = int(self.demand[i]) if i is not None else 0
+                touched.add(self.set_demand(product_id, current + int(event.get('qty', 1))))
+            else:
+                touched.add(self.set_demand(product_id, event['Daily_Demand']))
+        new_bounds = self._boundaries()
+
+        # Untouched SKUs can only change category if a boundary moved past
+        # them, i.e. their demand lies between the old and new boundary value
+        # (inclusive: inserts and removals shift positions inside the
+        # boundary bucket even when the boundary itself stays put)
+        rescan = set()
+        for old, new in zip(old_bounds, new_bounds):
+            if old is None and new is None:
+                continue
+            if old is None or new is None:
+                low, high = 0, float('inf')
+            else:
+                low, high = min(old[0], new[0]), max(old[0], new[0])
+            rescan.update(self.values[bisect.bisect_left(self.values, low):bisect.bisect_right(self.values, high)])
+
+        changed = [self._rescan_bucket(value, new_bounds) for value in rescan]
+        singles = [i for i in touched if int(self.demand[i]) not in rescan]
+        codes = [self._code(i, new_bounds) for i in singles]
+        changed.append(np.asarray(singles, dtype=np.int64)[np.asarray(codes, dtype=np.int8) != self.codes[singles]])
+        codes_by_index = dict(zip(singles, codes))
+
+        crossings = []
+        for i in np.concatenate(changed):
+            code = codes_by_index[i] if i in codes_by_index else self._code(i, new_bounds)
+            crossings.append((self.product_ids[i], self.labels[self.codes[i]], self.labels[code]))
+            self.codes[i] = code
+        return crossings
+
+    def _rescan_bucket(self, value, bounds):
+        # Vectorized re-evaluation of one bucket; returns members whose code changed
+        members = np.asarray(self.buckets[value], dtype=np.int64)
+        position = np.arange(len(members))
+        codes = np.zeros(len(members), dtype=np.int8)
+        for bound in bounds:
+            if bound is None or value < bound[0]:
+                codes += 1
+            elif value == bound[0]:
+                codes += position >= bound[1]
+        return members[codes != self.codes[members]]
+
+    def category(self, product_id):
+        return self.labels[self.codes[self.index[product_id]]]
+
+    def categories(self):
+        n = len(self.product_ids)
+        return dict(zip(self.product_ids, np.asarray(self.labels, dtype=object)[self.codes[:n]]))
+
+# --- JSONL tailing ---
+def parse_event(line):
+    # Returns the event dict, or raises ValueError for a line apply_events
+    # could not use: bad JSON, no Product_ID, a demand event without
+    # Daily_Demand, or a non-integer quantity
+    event = json.loads(line)
+    if not isinstance(event, dict) or event.get('Product_ID') is None:
+        raise ValueError("no Product_ID")
+    if event.get('event', 'demand') == 'pick':
+        int(event.get('qty', 1))
+    elif event.get('Daily_Demand') is None:
+        raise ValueError("demand event without Daily_Demand")
+    else:
+        int(event['Daily_Demand'])
+    return event
+
+def tail_events(path, follow=False, poll_interval=0.5, batch_size=1000, offset=0):
+    # Yields lists of parsed events, holding at most one batch in memory.
+    # With follow=True, keeps waiting for appended lines like `tail -f`;
+    # a trailing line without a newline is held back until it is complete.
+    # Lines parse_event rejects are skipped, with one warning each time the
+    # reader catches up with the end of the file.
+    with open(path, 'r', encoding='utf-8') as f:
+        f.seek(offset)
+        batch, partial = [], ''
+        skipped, first_error = 0, None
+        while True:
+            line = f.readline()
+            if line and (line.endswith('\n') or not follow):
+                line, partial = partial + line, ''
+                line = line.strip()
+                if line:
+                    try:
+                        batch.append(parse_event(line))
+                    except (ValueError, TypeError) as exc:
+                        # json.JSONDecodeError is a ValueError
+                        skipped += 1
+                        first_error = first_error or f"{exc} in {line[:80]!r}"
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+                continue
+            if line:
+                partial += line
+            if skipped:
+                logger.warning("Skipped %d unusable event line(s) in %s; first: %s", skipped, path, first_error)
+                skipped, first_error = 0, None
+            if batch:
+                yield batch
+                batch = []
+            if not follow:
+                return
+            time.sleep(poll_interval)
+
+def ingest_events(path, tracker, follow=False, poll_interval=0.5, batch_size=1000):
+    # Yields the ABC boundary crossings produced by each batch of events
+    for batch in tail_events(path, follow, poll_interval, batch_size):
+        yield tracker.apply_events(batch)
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+    from data_agent import generate_warehouse_data
+
+    df = generate_warehouse_data(1_000_000, seed=1)
+    start = time.perf_counter()
+    tracker = StreamingABC.from_frame(df)
+    print(f"Seeded 1,000,000 SKUs in {time.perf_counter() - start:.2f}s")
+
+    rng = np.random.default_rng(0)
+    n_events = 200_000
+    path = os.path.join(tempfile.mkdtemp(), 'events.jsonl')
+    with open(path, 'w', encoding='utf-8') as f:
+        skus = df['Product_ID'].to_numpy()[rng.integers(0, len(df), n_events)]
+        for product_id, qty in zip(skus, rng.integers(1, 5, n_events)):
+            f.write(json.dumps({'Product_ID': product_id, 'event': 'pick', 'qty': int(qty)}) + '\n')
+
+    start = time.perf_counter()
+    n_crossings = sum(len(crossings) for crossings in ingest_events(path, tracker, batch_size=5000))
+    elapsed = time.perf_counter() - start
+    print(f"Ingested {n_events:,} events in {elapsed:.2f}s ({n_events / elapsed:,.0f} events/s), {n_crossings:,} ABC crossings")
@@ -1,21 +1,59 @@
+import string
+
+import numpy as np
 import pandas as pd
 
-def perform_abc_analysis(df):
-    df_abc = df.copy()
-    df_abc['Total_Demand'] = df_abc['Daily_Demand']
-    df_abc = df_abc.sort_values(by='Total_Demand', ascending=False)
-    df_abc['Cum_Demand'] = df_abc['Total_Demand'].cumsum()
-    df_abc['Cum_Demand_Pct'] = 100 * df_abc['Cum_Demand'] / df_abc['Total_Demand'].sum()
+from schema import abc_dtype
+
+DEFAULT_THRESHOLDS = (80, 95)
+
+# Score used to rank items; 'value' needs a per-unit price column on the
+# frame, which the synthetic generator does not produce
+WEIGHTINGS = {
+    'demand': lambda df, value_col: df['Daily_Demand'],
+    'demand_weight': lambda df, value_col: df['Daily_Demand'] * df['Weight_kg'],
+    'value': lambda df, value_col: df['Daily_Demand'] * df[value_col],
+}
+
+def classify_cumulative(cum_pct, thresholds=DEFAULT_THRESHOLDS):
+    # Items up to the first threshold are 'A', up to the second 'B', and so on;
+    # one more label than there are thresholds
+    thresholds = np.asarray(sorted(thresholds), dtype=float)
+    labels = list(string.ascii_uppercase[:len(thresholds) + 1])
+    codes = np.searchsorted(thresholds, np.asarray(cum_pct, dtype=float), side='left')
+    return pd.Categorical.from_codes(codes, dtype=abc_dtype(labels))
 
-    def classify_abc(row):
-        if row['Cum_Demand_Pct'] <= 80:
-            return 'A'
-        elif row['Cum_Demand_Pct'] <= 95:
-            return 'B'
-        else:
-            return 'C'
+def perform_abc_analysis(df, thresholds=DEFAULT_THRESHOLDS, weighting='demand', group_by=None, value_col='Unit_Price'):
+    if weighting not in WEIGHTINGS:
+        raise ValueError(f"Unknown weighting '{weighting}', expected one of {sorted(WEIGHTINGS)}")
+    if weighting == 'value' and value_col not in df.columns:
+        raise ValueError(f"weighting='value' needs a per-unit price column, but the frame has no '{value_col}' column; "
+                         "pass value_col= to name the frame's price column")
 
-    df_abc['ABC_Category'] = df_abc.apply(classify_abc, axis=1)
+    # Rank on a standalone key frame and materialize the reordered catalogue
+    # once with take(), instead of copying the input and then sorting the copy
+    keys = pd.DataFrame({'Total_Demand': WEIGHTINGS[weighting](df, value_col).to_numpy()})
+
+    if group_by is None:
+        order = keys.sort_values(by='Total_Demand', ascending=False).index.to_numpy()
+        df_abc = df.take(order)
+        df_abc['Total_Demand'] = keys['Total_Demand'].to_numpy()[order]
+        df_abc['Cum_Demand'] = df_abc['Total_Demand'].cumsum()
+        total_demand = df_abc['Total_Demand'].sum()
+    else:
+        # Rank within each group (e.g. Product_Category or site) in one sort
+        group_cols = [group_by] if isinstance(group_by, str) else list(group_by)
+        for col in group_cols:
+            keys[col] = df[col].to_numpy()
+        order = keys.sort_values(by=group_cols + ['Total_Demand'], ascending=[True] * len(group_cols) + [False]).index.to_numpy()
+        df_abc = df.take(order)
+        df_abc['Total_Demand'] = keys['Total_Demand'].to_numpy()[order]
+        grouped = df_abc.groupby(group_cols, sort=False, observed=True)['Total_Demand']
+        df_abc['Cum_Demand'] = grouped.cumsum()
+        total_demand = grouped.transform('sum')
+
+    df_abc['Cum_Demand_Pct'] = 100 * df_abc['Cum_Demand'] / total_demand
+    df_abc['ABC_Category'] = classify_cumulative(df_abc['Cum_Demand_Pct'], thresholds)
 
     return df_abc
 
@@ -26,3 +64,7 @@ if __name__ == '__main__':
     print(df_analyzed[['Product_ID', 'Total_Demand', 'Cum_Demand_Pct', 'ABC_Category']].head())
     print("\nCategory distribution:")
     print(df_analyzed['ABC_Category'].value_counts())
+
+    print("\nPer-category distribution (70/90/97, demand x weight):")
+    df_grouped = perform_abc_analysis(df, thresholds=(70, 90, 97), weighting='demand_weight', group_by='Product_Category')
+    print(df_grouped.groupby(['Product_Category', 'ABC_Category']).size().unstack(fill_value=0))
@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Startup latency budget for app.py, measured with Streamlit's headless
+# AppTest runner. Each sample runs in a fresh interpreter so the cold start
+# includes importing the app's own modules, as after a server restart.
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+DEFAULT_BUDGETS = {
+    'cold_start_sec': 3.0,
+    'warm_rerun_sec': 0.3,
+    'run_optimization_sec': 2.0,
+}
+
+def measure_once(app_path=APP_PATH, warm_reruns=5):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(app_path, default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"app raised on first run: {at.exception[0].value}")
+    llm_client_loaded = 'google.generativeai' in sys.modules
+
+    warm = []
+    for _ in range(warm_reruns):
+        start = time.perf_counter()
+        at.run()
+        warm.append(time.perf_counter() - start)
+
+    button = next(button for button in at.button if button.label == "Run Optimization")
+    start = time.perf_counter()
+    button.click().run()
+    run_optimization = time.perf_counter() - start
+    return {
+        'cold_start_sec': cold,
+        'warm_rerun_sec': statistics.median(warm),
+        'run_optimization_sec': run_optimization,
+        'llm_client_loaded': llm_client_loaded,
+    }
+
+def measure(samples=3, app_path=APP_PATH):
+    # Medians over fresh processes; the summary backend is the offline stub
+    env = {**os.environ, 'SUMMARY_BACKEND': 'stub'}
+    results = []
+    for _ in range(samples):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure-once', '--app', app_path],
+                             env=env, capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    summary = {key: statistics.median(result[key] for result in results) for key in DEFAULT_BUDGETS}
+    summary['llm_client_loaded'] = any(result['llm_client_loaded'] for result in results)
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check app.py cold-start and rerun latency against a budget.")
+    parser.add_argument('--samples', type=int, default=3)
+    parser.add_argument('--app', default=APP_PATH)
+    for key, budget in DEFAULT_BUDGETS.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=float, default=budget, help=f"budget (default {budget})")
+    parser.add_argument('--measure-once', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure_once:
+        print(json.dumps(measure_once(args.app)))
+        return 0
+
+    summary = measure(args.samples, args.app)
+    failed = False
+    for key in DEFAULT_BUDGETS:
+        budget = getattr(args, key)
+        ok = summary[key] <= budget
+        failed |= not ok
+        print(f"{key:<22} {summary[key]:7.3f}s  (budget {budget:.3f}s)  {'ok' if ok else 'OVER BUDGET'}")
+    print(f"LLM client imported before a summary was requested: {'yes' if summary['llm_client_loaded'] else 'no'}")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,160 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+LAYOUT_COLUMNS = ['Product_ID', 'Product_Category', 'ABC_Category', 'Daily_Demand', 'Current_Location', 'Target_Zone',
+                  'New_Location', 'Move_Wave']
+SORTABLE_COLUMNS = ['Daily_Demand', 'Product_ID', 'ABC_Category', 'Product_Category', 'Current_Location', 'New_Location',
+                    'Move_Wave']
+DEFAULT_PAGE_SIZE = 50
+
+class LayoutStore:
+    # Server-side view over the optimized layout: the browser only ever
+    # receives one page of rows and a few hundred chart points, whatever the
+    # catalogue size. Sort orders are built on first use and kept, so paging
+    # through a sorted (unfiltered) table costs O(page_size).
+    def __init__(self, df_optimized, columns=LAYOUT_COLUMNS, max_cached_filters=8):
+        self.df = df_optimized[[col for col in columns if col in df_optimized.columns]].reset_index(drop=True)
+        self.max_cached_filters = max_cached_filters
+        self._orders = {}
+        self._masks = OrderedDict()
+        self._sorted_ids = None
+
+    def __len__(self):
+        return len(self.df)
+
+    # --- Indexes ---
+    def sort_order(self, column):
+        # Stable ascending order of the rows by column (ties by row position)
+        if column not in self._orders:
+            values = self.df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                self._orders[column] = np.argsort(values.cat.codes.to_numpy(), kind='stable')
+            else:
+                # Arrow-backed strings sort natively, far faster than object arrays
+                self._orders[column] = values.argsort(kind='stable').to_numpy()
+        return self._orders[column]
+
+    def _prefix_range(self, prefix):
+        # Rows whose Product_ID starts with prefix, via binary search on the sorted IDs
+        order = self.sort_order('Product_ID')
+        if self._sorted_ids is None:
+            self._sorted_ids = self.df['Product_ID'].to_numpy(dtype=object)[order]
+        start = np.searchsorted(self._sorted_ids, prefix, side='left')
+        stop = np.searchsorted(self._sorted_ids, prefix + '\uffff', side='left')
+        return order[start:stop]
+
+    # --- Filtering ---
+    def _mask(self, search, abc, product_category, demand_range):
+        key = (search, tuple(abc or ()), tuple(product_category or ()), tuple(demand_range or ()))
+        if key in self._masks:
+            self._masks.move_to_end(key)
+            return self._masks[key]
+
+        mask = None
+        def combine(condition):
+            return condition if mask is None else mask & condition
+
+        if search:
+            search = search.strip().upper()
+            rows = self._prefix_range(search)
+            if len(rows):
+                condition = np.zeros(len(self.df), dtype=bool)
+                condition[rows] = True
+            else:
+                # Not an ID prefix: fall back to a substring scan
+                condition = self.df['Product_ID'].str.upper().str.contains(search, regex=False).to_numpy(dtype=bool)
+            mask = combine(condition)
+        for col, selected in (('ABC_Category', abc), ('Product_Category', product_category)):
+            if selected:
+                mask = combine(self.df[col].isin(list(selected)).to_numpy())
+        if demand_range:
+            low, high = demand_range
+            demand = self.df['Daily_Demand'].to_numpy()
+            mask = combine((demand >= low) & (demand <= high))
+
+        self._masks[key] = mask
+        while len(self._masks) > self.max_cached_filters:
+            self._masks.popitem(last=False)
+        return mask
+
+    def count(self, search=None, abc=None, product_category=None, demand_range=None):
+        mask = self._mask(search, abc, product_category, demand_range)
+        return len(self.df) if mask is None else int(mask.sum())
+
+    def query(self, search=None, abc=None, product_category=None, demand_range=None,
+              sort_by='Daily_Demand', descending=True, page=0, page_size=DEFAULT_PAGE_SIZE):
+        # Returns (page_frame, total_matching_rows)
+        if sort_by not in self.df.columns:
+            raise ValueError(f"Cannot sort by '{sort_by}', expected one of {list(self.df.columns)}")
+        order = self.sort_order(sort_by)
+        if descending:
+            order = order[::-1]
+        mask = self._mask(search, abc, product_category, demand_range)
+        if mask is not None:
+            order = order[mask[order]]
+        total = len(order)
+        start = max(page, 0) * page_size
+        return self.df.take(order[start:start + page_size]), total
+
+    def options(self, column):
+        values = self.df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return list(values.cat.categories)
+        return sorted(values.dropna().unique())
+
+    # --- Pre-aggregated chart data (size independent of the SKU count) ---
+    def pareto_curve(self, points=200):
+        # Cumulative share of demand against share of SKUs, highest demand first
+        if not len(self.df):
+            return pd.DataFrame({'SKU_Share_Pct': [], 'Demand_Share_Pct': []})
+        demand = self.df['Daily_Demand'].to_numpy(dtype='float64')[self.sort_order('Daily_Demand')[::-1]]
+        cumulative = np.cumsum(demand)
+        idx = np.unique(np.linspace(0, len(demand) - 1, min(points, len(demand))).round().astype(np.int64))
+        total = cumulative[-1] or 1.0
+        return pd.DataFrame({
+            'SKU_Share_Pct': (idx + 1) / len(demand) * 100,
+            'Demand_Share_Pct': cumulative[idx] / total * 100,
+        })
+
+    def demand_histogram(self, bins=40):
+        # SKU counts per demand bin and ABC category
+        demand = self.df['Daily_Demand'].to_numpy()
+        if not len(demand):
+            return pd.DataFrame(columns=['Demand_From', 'Demand_To', 'ABC_Category', 'SKUs'])
+        edges = np.unique(np.linspace(demand.min(), demand.max() + 1, bins + 1).round().astype(np.int64))
+        bin_index = np.clip(np.searchsorted(edges, demand, side='right') - 1, 0, len(edges) - 2)
+        counts = (pd.DataFrame({'bin': bin_index, 'ABC_Category': self.df['ABC_Category'].to_numpy()})
+                  .groupby(['bin', 'ABC_Category'], observed=True).size().rename('SKUs').reset_index())
+        counts['Demand_From'] = edges[counts['bin']]
+        counts['Demand_To'] = edges[counts['bin'] + 1]
+        return counts[['Demand_From', 'Demand_To', 'ABC_Category', 'SKUs']]
+
+    def category_summary(self):
+        # SKUs and demand per ABC and product category
+        return (self.df.groupby(['ABC_Category', 'Product_Category'], observed=True)['Daily_Demand']
+                .agg(SKUs='size', Total_Demand='sum').reset_index())
+
+if __name__ == '__main__':
+    import time
+    from data_agent import generate_warehouse_data
+    from inventory_agent import perform_abc_analysis
+    from slotting_agent import recommend_slotting
+
+    df_optimized = recommend_slotting(perform_abc_analysis(generate_warehouse_data(1_000_000, seed=1)))
+    store = LayoutStore(df_optimized)
+    for label, kwargs in [
+        ("First page (builds the sort index)", {}),
+        ("Page 500, sorted by demand", {'page': 500}),
+        ("Sorted by Product_ID", {'sort_by': 'Product_ID', 'descending': False}),
+        ("Filter ABC=A, Groceries", {'abc': ['A'], 'product_category': ['Groceries']}),
+        ("Same filter, page 2", {'abc': ['A'], 'product_category': ['Groceries'], 'page': 2}),
+        ("Search 'PROD_1234'", {'search': 'PROD_1234'}),
+    ]:
+        start = time.perf_counter()
+        page, total = store.query(**kwargs)
+        print(f"{label:<38} {(time.perf_counter() - start) * 1000:8.1f}ms, {total:>9,} rows, {len(page)} shown")
+    start = time.perf_counter()
+    charts = [store.pareto_curve(), store.demand_histogram(), store.category_summary()]
+    print(f"Chart data: {sum(len(c) for c in charts)} rows in {(time.perf_counter() - start) * 1000:.1f}ms")
@@ -1 +1,225 @@
-# Placeholder for orchestration utilities
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# --- Content hashing ---
+def hash_value(value):
+    # Stable digest for stage inputs and parameters; frames and arrays are
+    # hashed by content, everything else by repr
+    digest = hashlib.sha256()
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        dtypes = value.dtypes.items() if isinstance(value, pd.DataFrame) else [(value.name, value.dtype)]
+        digest.update(repr([(col, str(dtype)) for col, dtype in dtypes]).encode())
+    elif isinstance(value, np.ndarray):
+        digest.update(str(value.dtype).encode() + repr(value.shape).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=repr):
+            digest.update(repr(key).encode() + hash_value(value[key]).encode())
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            digest.update(hash_value(item).encode())
+    else:
+        digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+# --- Bounded LRU with optional disk spill ---
+class StageCache:
+    # Thread-safe, so one cache can back pipelines in concurrent app sessions
+    def __init__(self, max_entries=32, spill_dir=None):
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.pkl")
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries or bool(self.spill_dir and os.path.exists(self._spill_path(key)))
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            if self.spill_dir and os.path.exists(self._spill_path(key)):
+                with open(self._spill_path(key), 'rb') as f:
+                    value = pickle.load(f)
+                self.put(key, value)
+                return value
+        raise KeyError(key)
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                old_key, old_value = self._entries.popitem(last=False)
+                if self.spill_dir and not os.path.exists(self._spill_path(old_key)):
+                    # Write then rename so a crash never leaves a truncated entry
+                    tmp_path = self._spill_path(old_key) + '.tmp'
+                    with open(tmp_path, 'wb') as f:
+                        pickle.dump(old_value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(tmp_path, self._spill_path(old_key))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.spill_dir:
+                for name in os.listdir(self.spill_dir):
+                    if name.endswith('.pkl'):
+                        os.remove(os.path.join(self.spill_dir, name))
+
+# --- Pipeline DAG ---
+class Stage:
+    def __init__(self, name, func, deps=(), params=None, cache=True):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.params = dict(params or {})
+        self.cache = cache
+
+class Pipeline:
+    def __init__(self, cache=None, profiler=None):
+        self.stages = OrderedDict()
+        self.cache = cache if cache is not None else StageCache()
+        # profiling_utils.Profiler; records a span for every computed stage
+        self.profiler = profiler
+        self.last_run = {}
+
+    def add_stage(self, name, func, deps=(), cache=True, **params):
+        # cache=False keeps large intermediates that are cheap to rebuild (or
+        # nearly duplicated downstream) out of the cache
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self.stages[name] = Stage(name, func, deps, params, cache)
+        return self
+
+    def _upstream(self, targets):
+        # Stages needed for the targets, in dependency (insertion) order
+        needed = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.stages[name].deps)
+        return [name for name in self.stages if name in needed]
+
+    def stage_keys(self, targets=None, inputs=None, params=None):
+        return self._stage_keys(targets, inputs, params)[0]
+
+    def _stage_keys(self, targets=None, inputs=None, params=None):
+        # Also returns the unseeded stages: a stage run with seed=None draws
+        # fresh randomness every time, so it and everything downstream of it
+        # gets a one-off key and is never cached
+        inputs = inputs or {}
+        params = params or {}
+        keys, unseeded = {}, set()
+        for name in self._upstream(list(targets or self.stages)):
+            stage = self.stages[name]
+            if name in inputs:
+                keys[name] = hash_value(inputs[name])
+                continue
+            stage_params = {**stage.params, **params.get(name, {})}
+            if ('seed' in stage_params and stage_params['seed'] is None) or unseeded.intersection(stage.deps):
+                unseeded.add(name)
+                keys[name] = hash_value([name, os.urandom(16)])
+            else:
+                # Keys chain through upstream keys rather than rehashing
+                # upstream outputs, so an unchanged prefix costs nothing
+                keys[name] = hash_value([name, getattr(stage.func, '__qualname__', repr(stage.func)),
+                                         stage_params, [keys[dep] for dep in stage.deps]])
+        return keys, unseeded
+
+    def run(self, targets=None, inputs=None, params=None):
+        # inputs: {stage: value} replaces a stage's output with external data
+        # (hashed by content); params: {stage: {param: value}} overrides
+        inputs = inputs or {}
+        params = params or {}
+        targets = list(targets or self.stages)
+        keys, unseeded = self._stage_keys(targets, inputs, params)
+
+        outputs, status = {}, {}
+
+        def resolve(name):
+            # Depth-first and lazy: a cached stage never touches its upstream
+            if name in outputs:
+                return outputs[name]
+            stage = self.stages[name]
+            if name in inputs:
+                outputs[name], status[name] = inputs[name], 'input'
+                return outputs[name]
+            cache = stage.cache and name not in unseeded
+            if cache:
+                try:
+                    # A shared cache may evict between a membership test and
+                    # the read, so just try the read
+                    outputs[name], status[name] = self.cache.get(keys[name]), 'cached'
+                    return outputs[name]
+                except KeyError:
+                    pass
+            stage_params = {**stage.params, **params.get(name, {})}
+            args = [resolve(dep) for dep in stage.deps]
+            if self.profiler is not None:
+                outputs[name] = self.profiler.call(name, stage.func, *args, **stage_params)
+            else:
+                outputs[name] = stage.func(*args, **stage_params)
+            status[name] = 'computed'
+            if cache:
+                self.cache.put(keys[name], outputs[name])
+            return outputs[name]
+
+        results = {name: resolve(name) for name in targets}
+        self.last_run = status
+        return results
+
+def build_warehouse_pipeline(cache=None, seed=None, n_products=100, n_locations=50, pick_orders=20_000, profiler=None):
+    from data_agent import generate_location_data, generate_warehouse_data
+    from inventory_agent import perform_abc_analysis
+    from kpi_agent import calculate_kpis
+    from recommendation_agent import generate_kpi_recommendations
+    from reslotting_agent import plan_reslotting
+    from simulator import simulate_slotting
+    from slotting_agent import optimize_slotting, recommend_slotting
+
+    pipeline = Pipeline(cache, profiler)
+    pipeline.add_stage('data', generate_warehouse_data, n_products=n_products, n_locations=n_locations, seed=seed)
+    pipeline.add_stage('locations', generate_location_data, n_locations=n_locations, seed=seed)
+    # The analyzed frame is the slotting output minus one column; not worth caching twice
+    pipeline.add_stage('abc', perform_abc_analysis, deps=['data'], cache=False)
+    pipeline.add_stage('slotting', recommend_slotting, deps=['abc'])
+    pipeline.add_stage('pick_simulation', simulate_slotting, deps=['slotting'], n_orders=pick_orders, seed=0)
+    # Minimal-move plan from the current layout; a None 'locations' input
+    # falls back to the location IDs found in the data. The slotting output
+    # carries the ABC columns, so a cached slotting never recomputes 'abc'.
+    pipeline.add_stage('reslotting', plan_reslotting, deps=['slotting', 'locations'])
+    # The optimized frame carries every raw column, so it serves as both
+    # inputs; locations and move counts come from the re-slotting plan
+    pipeline.add_stage('kpis', calculate_kpis, deps=['slotting', 'slotting', 'pick_simulation', 'reslotting'])
+    pipeline.add_stage('recommendations', generate_kpi_recommendations, deps=['kpis', 'reslotting'])
+    # Capacity-aware assignment against the location table (volume, weight
+    # and travel cost per slot); needs a real 'locations' table, not None
+    pipeline.add_stage('capacity_slotting', optimize_slotting, deps=['slotting', 'locations'])
+    return pipeline
+
+if __name__ == '__main__':
+    targets = ['slotting', 'kpis', 'recommendations']
+    pipeline = build_warehouse_pipeline(seed=42)
+    pipeline.run(targets)
+    print("First run: ", pipeline.last_run)
+    pipeline.run(targets)
+    print("Second run:", pipeline.last_run)
+    pipeline.run(targets, params={'abc': {'thresholds': (70, 90)}})
+    print("New ABC thresholds:", pipeline.last_run)
@@ -0,0 +1,173 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'warehouse_stage'
+SPAN_COLUMNS = ['Stage', 'Seconds', 'Rows_In', 'Rows_Out', 'RSS_Delta_MB', 'Status']
+
+def rss_bytes():
+    # Current resident set size; /proc is cheap enough to read around every
+    # stage, unlike tracemalloc, which slows the traced code down
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def count_rows(value):
+    # Rows of a frame, array or list; None for scalars and dicts of KPIs
+    shape = getattr(value, 'shape', None)
+    if shape:
+        return int(shape[0])
+    if isinstance(value, (list, tuple)):
+        return len(value)
+    return None
+
+class Span:
+    def __init__(self, name, seconds, rows_in=None, rows_out=None, rss_delta_bytes=None, status='ok', profile=None):
+        self.name = name
+        self.seconds = seconds
+        self.rows_in = rows_in
+        self.rows_out = rows_out
+        self.rss_delta_bytes = rss_delta_bytes
+        self.status = status
+        # Top functions by cumulative time, when the stage was profiled
+        self.profile = profile
+
+    def as_dict(self):
+        rss_delta_mb = None if self.rss_delta_bytes is None else self.rss_delta_bytes / 1e6
+        return dict(zip(SPAN_COLUMNS, [self.name, self.seconds, self.rows_in, self.rows_out, rss_delta_mb, self.status]))
+
+class Profiler:
+    # Records one span per agent call, plus running totals for the metrics
+    # export. profile_stages: stage names (or True for all) to run under
+    # cProfile, which roughly doubles their runtime. sink: another Profiler
+    # that also receives every span, e.g. one process-wide exporter fed by
+    # per-session profilers.
+    def __init__(self, profile_stages=(), profile_top=15, metrics_path=None, sink=None):
+        self.profile_stages = profile_stages
+        self.profile_top = profile_top
+        self.metrics_path = metrics_path
+        self.sink = sink
+        self.spans = OrderedDict()
+        self.totals = OrderedDict()
+        self._lock = threading.Lock()
+        # Serializes metrics-file writes from concurrent sessions sharing this sink
+        self._write_lock = threading.Lock()
+
+    def _profiled(self, name):
+        return self.profile_stages is True or name in self.profile_stages
+
+    def call(self, name, func, *args, **kwargs):
+        # The same frame passed twice (e.g. raw and optimized) counts once
+        counts = [count_rows(arg) for arg in {id(arg): arg for arg in args}.values()]
+        counts = [rows for rows in counts if rows is not None]
+        rows_in = sum(counts) if counts else None
+        rss_before = rss_bytes()
+        profiler = cProfile.Profile() if self._profiled(name) else None
+        status, output = 'ok', None
+        start = time.perf_counter()
+        try:
+            if profiler:
+                profiler.enable()
+            output = func(*args, **kwargs)
+            return output
+        except Exception:
+            status = 'error'
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            profile = None
+            if profiler:
+                profiler.disable()
+                stream = io.StringIO()
+                pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(self.profile_top)
+                profile = stream.getvalue()
+            rss_after = rss_bytes()
+            rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            self.record(Span(name, elapsed, rows_in, count_rows(output), rss_delta, status, profile))
+
+    def record(self, span):
+        with self._lock:
+            self.spans[span.name] = span
+            self.spans.move_to_end(span.name)
+            total = self.totals.setdefault(span.name, {'calls': 0, 'errors': 0, 'seconds': 0.0})
+            total['calls'] += 1
+            total['errors'] += span.status == 'error'
+            total['seconds'] += span.seconds
+        if self.metrics_path:
+            try:
+                self.write_metrics(self.metrics_path)
+            except OSError:
+                # A failed export must never fail the profiled call
+                logger.exception("Could not write metrics to %s", self.metrics_path)
+        if self.sink is not None:
+            self.sink.record(span)
+
+    def table(self):
+        # Latest span per stage as a frame, for display
+        import pandas as pd
+
+        with self._lock:
+            rows = [span.as_dict() for span in self.spans.values()]
+        return pd.DataFrame(rows, columns=SPAN_COLUMNS).astype({'Rows_In': 'Int64', 'Rows_Out': 'Int64'})
+
+    # --- Prometheus text export ---
+    def prometheus_text(self):
+        with self._lock:
+            spans = list(self.spans.values())
+            totals = {name: dict(total) for name, total in self.totals.items()}
+        metrics = [
+            ('seconds_total', 'counter', 'Total seconds spent in the stage', [(n, t['seconds']) for n, t in totals.items()]),
+            ('calls_total', 'counter', 'Number of stage calls', [(n, t['calls']) for n, t in totals.items()]),
+            ('errors_total', 'counter', 'Number of stage calls that raised', [(n, t['errors']) for n, t in totals.items()]),
+            ('last_seconds', 'gauge', 'Duration of the latest stage call', [(s.name, s.seconds) for s in spans]),
+            ('last_rows_in', 'gauge', 'Rows passed into the latest stage call', [(s.name, s.rows_in) for s in spans]),
+            ('last_rows_out', 'gauge', 'Rows returned by the latest stage call', [(s.name, s.rows_out) for s in spans]),
+            ('last_rss_delta_bytes', 'gauge', 'Resident memory change over the latest stage call', [(s.name, s.rss_delta_bytes) for s in spans]),
+        ]
+        lines = []
+        for suffix, kind, help_text, samples in metrics:
+            samples = [(name, value) for name, value in samples if value is not None]
+            if not samples:
+                continue
+            metric = f"{METRIC_PREFIX}_{suffix}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, value in samples:
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'{metric}{{stage="{label}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, path):
+        # Write then rename so a scraper (e.g. node_exporter's textfile
+        # collector) never reads a half-written file
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._write_lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, path)
+
+if __name__ == '__main__':
+    import tempfile
+    from orchestration_utils import build_warehouse_pipeline
+
+    metrics_path = os.path.join(tempfile.mkdtemp(), 'warehouse.prom')
+    profiler = Profiler(profile_stages={'slotting'}, metrics_path=metrics_path)
+    pipeline = build_warehouse_pipeline(seed=42, n_products=1_000_000, profiler=profiler)
+    pipeline.run(['kpis', 'recommendations'])
+    print(profiler.table().to_string(index=False))
+    print(f"\nMetrics written to {metrics_path}:\n")
+    with open(metrics_path) as f:
+        print(f.read())
+    print(profiler.spans['slotting'].profile)
@@ -1,6 +1,24 @@
 import pandas as pd
 
-def generate_kpi_recommendations(kpis):
+from kpi_agent import format_kpis
+
+def generate_kpi_recommendations(kpis, reslotting_plan=None):
+    # reslotting_plan: (df_plan, moves, report) from reslotting_agent.plan_reslotting
+    kpis = format_kpis(kpis)
+    consolidation_action = "Consolidate fragmented inventory by co-locating similar SKUs."
+    consolidation_details = "Move all products from 'Current Location' to the recommended 'New Location' to improve pick-path efficiency and reduce space wastage."
+    layout_action = "Utilize the 'Optimized Warehouse Layout' table for a precise SKU-by-SKU relocation plan."
+    layout_details = "The attached table provides the exact 'New Location' for each product, enabling immediate action on the warehouse floor."
+    if reslotting_plan is not None:
+        report = reslotting_plan[2]
+        consolidation_action = (f"Re-slot {report['moved']:,} of {report['skus']:,} SKUs ({report['move_pct']:.1f}%) in "
+                                f"{report['waves']} move waves; the other {report['kept']:,} are already in the right zone and stay put.")
+        consolidation_details = (f"The plan takes {report['total_moves']:,} moves ({report['buffer_moves']:,} through the staging buffer "
+                                 f"to break swap cycles), about {report['labour_hours']:,.1f} labour hours "
+                                 f"(~${report['labour_cost']:,.0f}). Run the waves in order; moves within a wave are independent.")
+        layout_action = "Work through the move list wave by wave, using the 'Optimized Warehouse Layout' table to check each SKU."
+        layout_details = ("The layout table gives each product's target zone, 'New Location' and move wave (0 for SKUs that stay put); "
+                          "the move list gives the order of moves within each wave.")
     # This will now return a structured list of dictionaries
     recommendations_data = [
         {
@@ -12,8 +30,8 @@ def generate_kpi_recommendations(kpis):
         {
             "KPI": "Inventory Consolidation",
             "Current State": kpis.get('Inventory_Consolidation_Index', 'N/A'),
-            "Action/Recommendation": "Consolidate fragmented inventory by co-locating similar SKUs.",
-            "Additional Details": "Move all products from 'Current Location' to the recommended 'New Location' to improve pick-path efficiency and reduce space wastage."
+            "Action/Recommendation": consolidation_action,
+            "Additional Details": consolidation_details
         },
         {
             "KPI": "Average Pick Time",
@@ -36,8 +54,21 @@ def generate_kpi_recommendations(kpis):
         {
             "KPI": "Detailed Recommendations",
             "Current State": f"{kpis.get('Total_SKUs', 'N/A')} SKUs",
-            "Action/Recommendation": "Utilize the 'Optimized Warehouse Layout' table for a precise SKU-by-SKU relocation plan.",
-            "Additional Details": "The attached table provides the exact 'New Location' for each product, enabling immediate action on the warehouse floor."
+            "Action/Recommendation": layout_action,
+            "Additional Details": layout_details
         }
     ]
     return pd.DataFrame(recommendations_data)
+
+def generate_summary_text(kpis):
+    # Template executive summary, used when the LLM is slow or unavailable
+    recommendations = generate_kpi_recommendations(kpis)
+    lines = [
+        f"The optimization run covered {kpis.get('Total_SKUs', 'N/A')} SKUs; "
+        f"re-slotting by demand puts the fastest movers closest to the docks.",
+        "",
+    ]
+    for _, row in recommendations.iloc[:4].iterrows():
+        lines.append(f"- **{row['KPI']}** ({row['Current State']}): {row['Action/Recommendation']}")
+    lines += ["", "**Next step:** " + recommendations.iloc[-1]['Action/Recommendation']]
+    return "\n".join(lines)
@@ -0,0 +1,235 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from slotting_agent import ZONE_ORDER
+
+ZONES = sorted(ZONE_ORDER, key=ZONE_ORDER.get)
+BUFFER_LOCATION = 'STAGING'
+DEFAULT_SLACK = 0.1
+HANDLING_SEC_PER_MOVE = 120.0
+WALK_SPEED_MPS = 1.0
+LABOUR_RATE_PER_HOUR = 25.0
+MOVES_PER_BATCH = 25
+
+def _location_table(df, locations):
+    # Location IDs in travel order, with (x, y) coordinates for distance
+    # estimates. Without a location table (data_agent.generate_location_data)
+    # the ID order stands in for travel order, one metre apart.
+    if locations is None:
+        ids = np.sort(pd.unique(df['Current_Location'].dropna().to_numpy(dtype=object)))
+        return ids, np.column_stack([np.arange(len(ids), dtype='float64'), np.zeros(len(ids))])
+    order = np.argsort(locations['Travel_Cost'].to_numpy(), kind='stable')
+    ids = locations['Location_ID'].to_numpy(dtype=object)[order]
+    if {'X_m', 'Y_m'} <= set(locations.columns):
+        coords = locations[['X_m', 'Y_m']].to_numpy(dtype='float64')[order]
+    else:
+        coords = np.column_stack([locations['Travel_Cost'].to_numpy(dtype='float64')[order], np.zeros(len(ids))])
+    return ids, coords
+
+def _target_zones(class_zone, demand, zone_capacity):
+    # Each SKU targets its ABC zone; if a zone is over capacity its
+    # lowest-demand SKUs spill to the next zone, and the last zone's
+    # highest-demand overflow goes back to the nearest zone with room
+    target = class_zone.copy()
+    last = len(zone_capacity) - 1
+    for zone in range(last):
+        members = np.flatnonzero(target == zone)
+        overflow = len(members) - zone_capacity[zone]
+        if overflow > 0:
+            target[members[np.argsort(-demand[members], kind='stable')[-overflow:]]] = zone + 1
+    members = np.flatnonzero(target == last)
+    members = members[np.argsort(-demand[members], kind='stable')]
+    overflow = len(members) - zone_capacity[last]
+    room = zone_capacity - np.bincount(target, minlength=len(zone_capacity))
+    for zone in range(last - 1, -1, -1):
+        take = max(min(overflow, room[zone]), 0)
+        target[members[:take]] = zone
+        members, overflow = members[take:], overflow - take
+    return target
+
+def _resolve_waves(dep):
+    # dep[m]: the mover whose slot m takes (-1 for a slot that is free now).
+    # Each slot goes to one mover, so dependencies form chains and cycles.
+    # A chain runs back to front; a cycle is broken by parking one member in
+    # the buffer first. Returns each mover's wave and the parked members.
+    dep = dep.tolist()
+    wave = [0] * len(dep)
+    parked = [False] * len(dep)
+    state = [0] * len(dep)  # 0 unseen, 1 on the current path, 2 resolved
+    for m in range(len(dep)):
+        if state[m]:
+            continue
+        path, x = [], m
+        while x != -1 and state[x] == 0:
+            state[x] = 1
+            path.append(x)
+            x = dep[x]
+        if x != -1 and state[x] == 1:
+            parked[x] = True
+        for y in reversed(path):
+            d = dep[y]
+            if d == -1:
+                wave[y] = 1
+            elif parked[d] and d != y:
+                # d leaves for the buffer in wave 1
+                wave[y] = 2
+            else:
+                wave[y] = wave[d] + 1
+            state[y] = 2
+    return np.asarray(wave, dtype=np.int64), np.asarray(parked, dtype=bool)
+
+def plan_reslotting(df_analyzed, locations=None, capacity=None, slack=DEFAULT_SLACK, handling_sec=HANDLING_SEC_PER_MOVE,
+                    walk_speed_mps=WALK_SPEED_MPS, labour_rate_per_hour=LABOUR_RATE_PER_HOUR, batch_size=MOVES_PER_BATCH):
+    # Minimal-move alternative to recommend_slotting: locations are split into
+    # A/B/C zones in travel order, sized to the ABC class counts, and every SKU
+    # already in its class's zone stays put. Only the rest move, highest
+    # demand first into the closest slot of their zone, preferring slots that
+    # are free now over slots another mover has to vacate first.
+    # Returns (df_plan, moves, report).
+    start = time.perf_counter()
+    n = len(df_analyzed)
+    ids, coords = _location_table(df_analyzed, locations)
+    n_locations = len(ids)
+    current = pd.Index(ids).get_indexer(df_analyzed['Current_Location'].to_numpy(dtype=object))
+    known = current >= 0
+    occupancy = np.bincount(current[known], minlength=n_locations)
+    if capacity is None:
+        # Room for everything currently stored plus some slack for re-slotting
+        capacity = max(int(occupancy.max(initial=0)), int(np.ceil(n / max(n_locations, 1) * (1 + slack))))
+    cap = np.broadcast_to(np.asarray(capacity, dtype=np.int64), (n_locations,))
+    if cap.sum() < n:
+        raise ValueError(f"{n_locations} locations hold {int(cap.sum())} SKUs but the catalogue has {n}")
+
+    # Zones: walk locations in travel order, filling the class counts in turn
+    demand = df_analyzed['Daily_Demand'].to_numpy(dtype='float64')
+    class_zone = (pd.Series(df_analyzed['ABC_Category'].to_numpy(dtype=object)).map(ZONE_ORDER)
+                  .fillna(len(ZONES)).to_numpy(dtype=np.int64) - 1)
+    class_counts = np.bincount(class_zone, minlength=len(ZONES))
+    location_zone = np.searchsorted(np.cumsum(class_counts)[:-1], np.cumsum(cap) - cap, side='right')
+    zone_capacity = np.bincount(location_zone, weights=cap, minlength=len(ZONES)).astype(np.int64)
+    target = _target_zones(class_zone, demand, zone_capacity)
+
+    # Stay where the current location is in the target zone, up to the
+    # location's capacity (highest demand first)
+    stays = known & (location_zone[np.maximum(current, 0)] == target)
+    by_location = np.lexsort((-demand, current))
+    by_location = by_location[stays[by_location]]
+    rank = pd.Series(current[by_location]).groupby(current[by_location]).cumcount().to_numpy()
+    stays[by_location[rank >= cap[current[by_location]]]] = False
+    stayers = np.bincount(current[stays], minlength=n_locations)
+
+    # Slots movers can use: free now, then vacated by a leaving mover
+    movers = np.flatnonzero(~stays)
+    free_now = np.maximum(cap - occupancy, 0)
+    vacated = cap - stayers - free_now
+    leaving = movers[known[movers]]
+    leaving = leaving[np.argsort(current[leaving], kind='stable')]
+    nth = pd.Series(current[leaving]).groupby(current[leaving]).cumcount().to_numpy()
+    leaving = leaving[nth < vacated[current[leaving]]]
+
+    destination = np.empty(n, dtype=np.int64)
+    vacates = np.full(n, -1, dtype=np.int64)
+    for zone in range(len(ZONES)):
+        in_zone = location_zone == zone
+        free_slots = np.repeat(np.flatnonzero(in_zone), free_now[in_zone])
+        vacated_slots = leaving[in_zone[current[leaving]]]
+        vacated_slots = vacated_slots[np.argsort(current[vacated_slots], kind='stable')]
+        slot_location = np.concatenate([free_slots, current[vacated_slots]])
+        slot_vacated_by = np.concatenate([np.full(len(free_slots), -1, dtype=np.int64), vacated_slots])
+        zone_movers = movers[target[movers] == zone]
+        zone_movers = zone_movers[np.argsort(-demand[zone_movers], kind='stable')]
+        destination[zone_movers] = slot_location[:len(zone_movers)]
+        vacates[zone_movers] = slot_vacated_by[:len(zone_movers)]
+
+    mover_position = np.full(n, -1, dtype=np.int64)
+    mover_position[movers] = np.arange(len(movers))
+    dep = np.where(vacates[movers] >= 0, mover_position[np.maximum(vacates[movers], 0)], -1)
+    wave, parked = _resolve_waves(dep)
+
+    # Move list: parked movers go to the buffer in wave 1 and on to their
+    # slot later. Location index n_locations is the buffer, at the dock.
+    buffer = n_locations
+    source = np.where(known[movers], current[movers], buffer)
+    moves = pd.DataFrame({
+        'Product_ID': np.concatenate([df_analyzed['Product_ID'].to_numpy(dtype=object)[movers[parked]],
+                                      df_analyzed['Product_ID'].to_numpy(dtype=object)[movers]]),
+        'From': np.concatenate([source[parked], np.where(parked, buffer, source)]),
+        'To': np.concatenate([np.full(int(parked.sum()), buffer), destination[movers]]),
+        'Wave': np.concatenate([np.ones(int(parked.sum()), dtype=np.int64), wave]),
+        'Move_Type': np.concatenate([np.full(int(parked.sum()), 'to_buffer', dtype=object),
+                                     np.where(parked, 'from_buffer', np.where(dep >= 0, 'chain', 'direct'))]),
+    })
+    unknown_from = df_analyzed['Current_Location'].to_numpy(dtype=object)[movers]
+    moves['From_Label'] = np.concatenate([unknown_from[parked], unknown_from])
+
+    # Within a wave, sweep sources in travel order; split into batches (trips)
+    moves = moves.sort_values(['Wave', 'From', 'To'], kind='stable', ignore_index=True)
+    moves['Sequence'] = moves.groupby('Wave').cumcount().to_numpy() + 1
+    moves['Batch'] = (moves['Sequence'].to_numpy() - 1) // batch_size + 1
+
+    points = np.vstack([coords, [[0.0, 0.0]]]) if n_locations else np.zeros((1, 2))
+    src = points[moves['From'].to_numpy()]
+    dst = points[moves['To'].to_numpy()]
+    moves['Travel_m'] = np.abs(src - dst).sum(axis=1)
+    # Walking between moves: from the dock to the first source of a batch,
+    # each destination to the next source, and back to the dock at the end
+    batch_key = moves['Wave'].to_numpy() * (len(moves) + 1) + moves['Batch'].to_numpy()
+    first = np.r_[True, batch_key[1:] != batch_key[:-1]] if len(moves) else np.zeros(0, dtype=bool)
+    last = np.r_[batch_key[1:] != batch_key[:-1], True] if len(moves) else np.zeros(0, dtype=bool)
+    previous_end = np.where(first[:, None], 0.0, np.roll(dst, 1, axis=0))
+    moves['Deadhead_m'] = np.abs(src - previous_end).sum(axis=1) + np.where(last, np.abs(dst).sum(axis=1), 0.0)
+    moves['Labour_Sec'] = handling_sec + (moves['Travel_m'] + moves['Deadhead_m']) / walk_speed_mps
+
+    labels = np.append(ids, BUFFER_LOCATION).astype(object)
+    moves['From'] = np.where(moves['From'].to_numpy() == buffer, np.where(moves['Move_Type'] == 'from_buffer', BUFFER_LOCATION, moves['From_Label']),
+                             labels[moves['From'].to_numpy()])
+    moves['To'] = labels[moves['To'].to_numpy()]
+    moves = moves[['Wave', 'Batch', 'Sequence', 'Product_ID', 'From', 'To', 'Move_Type', 'Travel_m', 'Deadhead_m', 'Labour_Sec']]
+
+    new_location = df_analyzed['Current_Location'].to_numpy(dtype=object).copy()
+    new_location[movers] = ids[destination[movers]]
+    move_wave = np.zeros(n, dtype=np.int64)
+    move_wave[movers] = wave
+    df_plan = df_analyzed.assign(Target_Zone=np.asarray(ZONES, dtype=object)[target], New_Location=new_location, Move_Wave=move_wave)
+
+    labour_hours = float(moves['Labour_Sec'].sum() / 3600)
+    report = {
+        'skus': n,
+        'kept': int(stays.sum()),
+        'moved': int(len(movers)),
+        'buffer_moves': int(parked.sum()),
+        'total_moves': int(len(moves)),
+        'move_pct': len(movers) / n * 100 if n else 0.0,
+        'waves': int(moves['Wave'].max()) if len(moves) else 0,
+        'capacity_per_location': int(cap.max(initial=0)),
+        'travel_m': float(moves['Travel_m'].sum() + moves['Deadhead_m'].sum()),
+        'labour_hours': labour_hours,
+        'labour_cost': labour_hours * labour_rate_per_hour,
+        'elapsed_sec': time.perf_counter() - start,
+    }
+    return df_plan, moves, report
+
+def wave_summary(moves):
+    # Moves, walking distance and labour per wave
+    return (moves.assign(Walk_m=moves['Travel_m'] + moves['Deadhead_m'])
+            .groupby('Wave').agg(Moves=('Product_ID', 'size'), Batches=('Batch', 'max'), Walk_m=('Walk_m', 'sum'),
+                                 Labour_Hours=('Labour_Sec', lambda s: s.sum() / 3600)).reset_index())
+
+if __name__ == '__main__':
+    from data_agent import generate_location_data, generate_warehouse_data
+    from inventory_agent import perform_abc_analysis
+
+    df_analyzed = perform_abc_analysis(generate_warehouse_data(seed=1))
+    df_plan, moves, report = plan_reslotting(df_analyzed, generate_location_data(seed=1))
+    print(moves.head(10).to_string(index=False))
+    print(f"\n{report['moved']} of {report['skus']} SKUs move ({report['total_moves']} moves incl. buffer) vs "
+          f"{report['skus']} with recommend_slotting; {report['waves']} waves, {report['labour_hours']:.1f} labour hours")
+    print(wave_summary(moves).to_string(index=False))
+
+    for n_skus in (100_000, 1_000_000):
+        df_analyzed = perform_abc_analysis(generate_warehouse_data(n_skus, n_locations=1000, seed=1))
+        df_plan, moves, report = plan_reslotting(df_analyzed, generate_location_data(1000, seed=1))
+        print(f"\n{n_skus:,} SKUs over 1,000 locations: {report['moved']:,} move ({report['move_pct']:.1f}%), "
+              f"{report['buffer_moves']:,} via buffer, {report['waves']} waves, planned in {report['elapsed_sec']:.2f}s")
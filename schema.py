@@ -0,0 +1,88 @@
+import string
+
+import pandas as pd
+
+# Shared column schema for the agent pipeline. Low-cardinality strings are
+# categoricals, numbers use the narrowest dtype that holds their range and
+# the old 'LxWxH' Dimensions_cm string is split into three integer columns.
+ITEM_TYPES = ['SKU', 'Non-SKU']
+DIMENSION_COLUMNS = ['Length_cm', 'Width_cm', 'Height_cm']
+
+NUMERIC_DTYPES = {
+    'Daily_Demand': 'int32',
+    'Length_cm': 'int16',
+    'Width_cm': 'int16',
+    'Height_cm': 'int16',
+    'Weight_kg': 'float32',
+}
+CATEGORICAL_COLUMNS = ['Item_Type', 'Product_Category', 'Current_Location', 'ABC_Category']
+# perform_abc_analysis labels bands A, B, C, ... (three with its default thresholds)
+ABC_LABELS = list(string.ascii_uppercase)
+DEFAULT_ABC_BANDS = 3
+
+def abc_dtype(labels):
+    return pd.CategoricalDtype(list(labels), ordered=True)
+
+def abc_categorical(values):
+    # The dtype perform_abc_analysis gives for as many bands as the highest
+    # label present (at least the default three), so frames typed here line
+    # up with its output whichever labels happen to occur
+    present = set(values.dropna().unique())
+    unknown = present - set(ABC_LABELS)
+    if unknown:
+        raise ValueError(f"Unknown ABC_Category labels: {sorted(map(str, unknown))}")
+    n_bands = max([DEFAULT_ABC_BANDS] + [ABC_LABELS.index(label) + 1 for label in present])
+    return values.astype(abc_dtype(ABC_LABELS[:n_bands]))
+
+def split_dimensions(df):
+    # 'LxWxH' -> Length_cm, Width_cm, Height_cm
+    parts = df['Dimensions_cm'].astype(str).str.split('x', n=2, expand=True)
+    df = df.drop(columns=['Dimensions_cm'])
+    for i, col in enumerate(DIMENSION_COLUMNS):
+        df[col] = pd.to_numeric(parts[i]).astype(NUMERIC_DTYPES[col])
+    return df
+
+def apply_schema(df):
+    # Coerce a frame from any source (legacy generator, CSV, Parquet) to the
+    # shared schema; columns that are already typed are left untouched.
+    # Columns are replaced rather than written in place, so a shallow copy
+    # keeps the caller's frame as it was.
+    df = df.copy(deep=False)
+    if 'Dimensions_cm' in df.columns:
+        df = split_dimensions(df)
+    for col, dtype in NUMERIC_DTYPES.items():
+        if col in df.columns and df[col].dtype != dtype:
+            df[col] = df[col].astype(dtype)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            if col == 'ABC_Category':
+                df[col] = abc_categorical(df[col])
+            else:
+                df[col] = df[col].astype('category')
+    return df
+
+def frame_memory(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+if __name__ == '__main__':
+    from data_agent import generate_warehouse_data
+    from inventory_agent import perform_abc_analysis
+    from slotting_agent import recommend_slotting
+
+    # Compare a session's resident frames before (df_raw, df_analyzed and
+    # df_optimized as object-dtype copies) and after (one typed frame)
+    df_raw = generate_warehouse_data(1_000_000, seed=1)
+    legacy_raw = df_raw.drop(columns=DIMENSION_COLUMNS).astype({
+        'Item_Type': object, 'Product_Category': object, 'Current_Location': object,
+        'Daily_Demand': 'int64', 'Weight_kg': 'float64',
+    })
+    legacy_raw['Dimensions_cm'] = (df_raw['Length_cm'].astype(str) + 'x' + df_raw['Width_cm'].astype(str)
+                                   + 'x' + df_raw['Height_cm'].astype(str)).astype(object)
+    legacy_analyzed = perform_abc_analysis(legacy_raw).astype({'ABC_Category': object})
+    legacy_optimized = recommend_slotting(legacy_analyzed)
+    legacy_total = sum(frame_memory(df) for df in (legacy_raw, legacy_analyzed, legacy_optimized))
+
+    df_optimized = recommend_slotting(perform_abc_analysis(df_raw))
+    print(f"Legacy session frames: {legacy_total / 1e6:,.0f} MB")
+    print(f"Typed session frame:   {frame_memory(df_optimized) / 1e6:,.0f} MB")
+    print(f"Reduction:             {legacy_total / frame_memory(df_optimized):.1f}x")
@@ -0,0 +1,279 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from datetime import datetime, timezone
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PATH = os.path.join('.cache', 'snapshots', 'warehouse.db')
+DEFAULT_CHUNK_ROWS = 100_000
+# Batches with at least 1/FULL_SCAN_FRACTION of a dictionary's IDs read it whole
+FULL_SCAN_FRACTION = 4
+SNAPSHOT_COLUMNS = ['Product_ID', 'Product_Category', 'ABC_Category', 'Daily_Demand', 'Current_Location', 'New_Location']
+
+# Product and location IDs are stored once in dictionary tables and referenced
+# by integer, which keeps a million-row layout snapshot to a few tens of MB.
+# The layout's primary key clusters rows by run; the secondary indexes serve
+# "where was this SKU" and "what was in this location" lookups without
+# touching any other run's rows.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    source TEXT,
+    seed INTEGER,
+    n_skus INTEGER NOT NULL,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS kpis (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS kpis_name_run ON kpis(name, run_id);
+CREATE TABLE IF NOT EXISTS products (
+    product_key INTEGER PRIMARY KEY,
+    product_id TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS locations (
+    location_key INTEGER PRIMARY KEY,
+    location_id TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS layout (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    product_key INTEGER NOT NULL,
+    product_category TEXT,
+    abc_category TEXT,
+    daily_demand INTEGER,
+    current_location INTEGER,
+    new_location INTEGER,
+    PRIMARY KEY (run_id, product_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS layout_product_run ON layout(product_key, run_id);
+CREATE INDEX IF NOT EXISTS layout_location_run ON layout(new_location, run_id);
+"""
+
+def flatten_kpis(kpis, prefix=''):
+    # Nested KPI dicts (abc_distribution) become dotted names; only numbers
+    # are kept, so every stored value is typed REAL
+    flat = {}
+    for name, value in kpis.items():
+        if isinstance(value, dict):
+            flat.update(flatten_kpis(value, f"{prefix}{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{name}"] = float(value)
+        elif hasattr(value, 'item') and getattr(value, 'ndim', 1) == 0:
+            # numpy scalars
+            flat[f"{prefix}{name}"] = float(value.item())
+    return flat
+
+class SnapshotStore:
+    # Append-only history of optimization runs in one SQLite file. Each call
+    # opens its own connection, so a store object can be shared across app
+    # sessions (threads) and processes; WAL mode lets readers run while a
+    # snapshot is being written.
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._write_lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            conn.execute("PRAGMA foreign_keys=ON")
+            # WAL stays consistent with NORMAL; a crash can only lose the last commits
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+
+    # --- Writes ---
+    @staticmethod
+    def _dictionary_keys(conn, table, id_column, key_column, values):
+        # Integer keys for string IDs, adding the ones not seen before. Keys
+        # are 1..n in insertion order (dictionary rows are never deleted).
+        # A small batch looks up only its own distinct IDs, through a temp
+        # table joined on the dictionary's unique index, so its cost follows
+        # the batch rather than the dictionary. A batch covering a large part
+        # of the dictionary reads it whole instead: one sequential scan beats
+        # that many index probes. Returns an object array of keys, None for
+        # missing IDs.
+        batch = pd.Index(pd.unique(values[pd.notna(values)]), dtype=object)
+        size = conn.execute(f"SELECT COALESCE(MAX({key_column}), 0) FROM {table}").fetchone()[0]
+        if len(batch) * FULL_SCAN_FRACTION >= size:
+            ids = pd.Index([row[0] for row in conn.execute(f"SELECT {id_column} FROM {table} ORDER BY {key_column}")], dtype=object)
+            batch_keys = ids.get_indexer(batch) + 1
+        else:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_ids (position INTEGER PRIMARY KEY, id TEXT NOT NULL)")
+            conn.execute("DELETE FROM temp.batch_ids")
+            conn.executemany("INSERT INTO temp.batch_ids (position, id) VALUES (?, ?)", enumerate(batch.tolist()))
+            found = np.array(conn.execute(f"SELECT b.position, d.{key_column} FROM temp.batch_ids b "
+                                          f"JOIN {table} d ON d.{id_column} = b.id").fetchall(), dtype=np.int64).reshape(-1, 2)
+            batch_keys = np.zeros(len(batch), dtype=np.int64)
+            batch_keys[found[:, 0]] = found[:, 1]
+        missing = np.flatnonzero(batch_keys == 0)
+        if len(missing):
+            batch_keys[missing] = np.arange(size + 1, size + len(missing) + 1)
+            conn.executemany(f"INSERT INTO {table} ({key_column}, {id_column}) VALUES (?, ?)",
+                             zip(batch_keys[missing].tolist(), batch[missing].tolist()))
+        # Position -1 (a missing ID) picks the appended 0
+        positions = batch.get_indexer(values)
+        keys = np.append(batch_keys, 0)[positions].astype(object)
+        keys[positions < 0] = None
+        return keys
+
+    def save_run(self, df_optimized, kpis, seed=None, source=None, params=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+        # Appends one run (layout rows and KPIs) in a single transaction and
+        # returns its run_id. Rows are inserted in product-key order with
+        # executemany, so the layout's primary key grows at its right edge.
+        missing = {'Product_ID', 'Current_Location'} - set(df_optimized.columns)
+        if missing:
+            raise ValueError(f"Snapshot needs columns {sorted(missing)}")
+        if df_optimized['Product_ID'].isna().any():
+            raise ValueError("Every snapshot row needs a Product_ID")
+        n = len(df_optimized)
+        def column(name):
+            return df_optimized[name].to_numpy(dtype=object) if name in df_optimized.columns else np.full(n, None, dtype=object)
+
+        with self._write_lock, self._connect() as conn:
+            conn.execute("PRAGMA cache_size=-262144")
+            # The first INSERT takes the write lock, so the dictionaries
+            # cannot change under us while their keys are assigned
+            run_id = conn.execute(
+                "INSERT INTO runs (created_at, source, seed, n_skus, params) VALUES (?, ?, ?, ?, ?)",
+                (datetime.now(timezone.utc).isoformat(timespec='milliseconds'), source,
+                 None if seed is None else int(seed), n, json.dumps(params, default=str) if params else None),
+            ).lastrowid
+            conn.executemany("INSERT INTO kpis (run_id, name, value) VALUES (?, ?, ?)",
+                             [(run_id, name, value) for name, value in flatten_kpis(kpis).items()])
+
+            product_keys = self._dictionary_keys(conn, 'products', 'product_id', 'product_key', column('Product_ID'))
+            location_keys = self._dictionary_keys(conn, 'locations', 'location_id', 'location_key',
+                                                  np.concatenate([column('Current_Location'), column('New_Location')]))
+            order = np.argsort(product_keys.astype(np.int64), kind='stable')
+            demand = column('Daily_Demand')
+            rows = zip(
+                [run_id] * n,
+                product_keys[order].tolist(),
+                column('Product_Category')[order].tolist(),
+                column('ABC_Category')[order].tolist(),
+                [None if pd.isna(value) else int(value) for value in demand[order]],
+                location_keys[:n][order].tolist(),
+                location_keys[n:][order].tolist(),
+            )
+            for start in range(0, n, chunk_rows):
+                conn.executemany("INSERT INTO layout (run_id, product_key, product_category, abc_category, daily_demand, "
+                                 "current_location, new_location) VALUES (?, ?, ?, ?, ?, ?, ?)", islice(rows, chunk_rows))
+        return run_id
+
+    def delete_runs(self, keep_last):
+        # Drops all but the newest keep_last runs; returns how many went
+        with self._write_lock, self._connect() as conn:
+            return conn.execute("DELETE FROM runs WHERE run_id NOT IN (SELECT run_id FROM runs ORDER BY run_id DESC LIMIT ?)",
+                                (keep_last,)).rowcount
+
+    # --- Reads ---
+    def _query(self, sql, params=()):
+        with self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def runs(self, limit=50):
+        # Newest first
+        return self._query("SELECT run_id, created_at, source, seed, n_skus, params FROM runs ORDER BY run_id DESC LIMIT ?", (limit,))
+
+    def kpi_names(self):
+        with self._connect() as conn:
+            return [name for (name,) in conn.execute("SELECT DISTINCT name FROM kpis ORDER BY name")]
+
+    def kpis(self, run_id):
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT name, value FROM kpis WHERE run_id = ?", (run_id,)))
+
+    def kpi_trend(self, names, limit=50):
+        # One row per run (oldest first) and one column per KPI, over the last
+        # limit runs
+        names = [names] if isinstance(names, str) else list(names)
+        trend = self._query(f"""
+            SELECT r.run_id, r.created_at, k.name, k.value
+            FROM (SELECT run_id, created_at FROM runs ORDER BY run_id DESC LIMIT ?) r
+            JOIN kpis k ON k.run_id = r.run_id AND k.name IN ({', '.join('?' * len(names))})
+            ORDER BY r.run_id
+        """, (limit, *names))
+        wide = trend.pivot(index=['run_id', 'created_at'], columns='name', values='value').reset_index()
+        wide.columns.name = None
+        return wide[['run_id', 'created_at'] + [name for name in names if name in wide.columns]]
+
+    def product_history(self, product_id, limit=50):
+        # Where one SKU sat (and its class) in each of the last limit runs
+        # that included it, newest first
+        return self._query("""
+            SELECT l.run_id, r.created_at, l.abc_category, l.daily_demand,
+                   c.location_id AS current_location, n.location_id AS new_location
+            FROM layout l
+            JOIN runs r ON r.run_id = l.run_id
+            LEFT JOIN locations c ON c.location_key = l.current_location
+            LEFT JOIN locations n ON n.location_key = l.new_location
+            WHERE l.product_key = (SELECT product_key FROM products WHERE product_id = ?)
+            ORDER BY l.run_id DESC LIMIT ?
+        """, (product_id, limit))
+
+    def location_history(self, location_id, limit=50):
+        # SKUs assigned to one location in the last limit runs, newest first
+        return self._query("""
+            SELECT l.run_id, p.product_id, l.abc_category, l.daily_demand
+            FROM layout l
+            JOIN products p ON p.product_key = l.product_key
+            WHERE l.new_location = (SELECT location_key FROM locations WHERE location_id = ?)
+              AND l.run_id IN (SELECT run_id FROM runs ORDER BY run_id DESC LIMIT ?)
+            ORDER BY l.run_id DESC, l.daily_demand DESC
+        """, (location_id, limit))
+
+    def layout(self, run_id):
+        # A whole snapshot back as a frame, in the SNAPSHOT_COLUMNS layout
+        frame = self._query("""
+            SELECT p.product_id AS Product_ID, l.product_category AS Product_Category, l.abc_category AS ABC_Category,
+                   l.daily_demand AS Daily_Demand, c.location_id AS Current_Location, n.location_id AS New_Location
+            FROM layout l
+            JOIN products p ON p.product_key = l.product_key
+            LEFT JOIN locations c ON c.location_key = l.current_location
+            LEFT JOIN locations n ON n.location_key = l.new_location
+            WHERE l.run_id = ?
+        """, (run_id,))
+        return frame
+
+if __name__ == '__main__':
+    import tempfile
+    from data_agent import generate_warehouse_data
+    from inventory_agent import perform_abc_analysis
+    from kpi_agent import calculate_kpis
+    from slotting_agent import recommend_slotting
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SnapshotStore(os.path.join(tmp, 'history.db'))
+        for n_skus, n_runs in ((100, 50), (1_000_000, 3)):
+            for seed in range(n_runs):
+                df_optimized = recommend_slotting(perform_abc_analysis(generate_warehouse_data(n_skus, n_locations=1000, seed=seed)))
+                kpis = calculate_kpis(df_optimized, df_optimized)
+                start = time.perf_counter()
+                run_id = store.save_run(df_optimized, kpis, seed=seed, source='demo')
+                elapsed = time.perf_counter() - start
+            print(f"Saved {n_runs} runs of {n_skus:,} SKUs; last took {elapsed:.2f}s ({n_skus / elapsed:,.0f} rows/s)")
+
+        for label, query in [
+            ("PROD_042 across the last 50 runs", lambda: store.product_history('PROD_042')),
+            ("Average pick time trend", lambda: store.kpi_trend('Average_Pick_Time_Sec')),
+            ("SKUs in LOC_A01, last 3 runs", lambda: store.location_history('LOC_A01', limit=3)),
+        ]:
+            start = time.perf_counter()
+            result = query()
+            print(f"{label:<40} {(time.perf_counter() - start) * 1000:7.1f}ms, {len(result):,} rows")
+        print(f"Database size: {os.path.getsize(store.path) / 1e6:.0f} MB")
@@ -0,0 +1,179 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from kpi_agent import format_kpis
+from recommendation_agent import generate_summary_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_SEC = 8.0
+
+def build_summary_prompt(kpis):
+    kpis = format_kpis(kpis)
+    return f"""
+    You are a data-driven AI assistant. Based on the following KPI data from a warehouse optimization run, provide a concise, bullet-point executive summary. Focus on actionable insights and key metrics.
+
+    Here are the KPI results:
+    - Storage Utilization Rate: {kpis.get('Storage_Utilization_Rate_Pct', 'N/A')}
+    - Inventory Consolidation Index: {kpis.get('Inventory_Consolidation_Index', 'N/A')}
+    - Average Pick Time: {kpis.get('Average_Pick_Time_Sec', 'N/A')}s
+    - Total SKUs: {kpis.get('Total_SKUs', 'N/A')}
+
+    **Instructions:**
+    1.  Start with a clear, one-sentence conclusion.
+    2.  Provide 3-4 bullet points highlighting the most impactful actions and metrics.
+    3.  Focus on numbers and specific outcomes rather than general statements.
+    4.  End with a call to action.
+    """
+
+# --- Backends: callables that turn a prompt into summary text ---
+class GeminiBackend:
+    def __init__(self, api_key, model_name='gemini-1.5-flash'):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+
+    def __call__(self, prompt):
+        return self.model.generate_content(prompt).text
+
+class StubBackend:
+    # Offline stand-in for load tests: deterministic text after a fixed latency
+    def __init__(self, latency_sec=0.0, fail=False):
+        self.latency_sec = latency_sec
+        self.fail = fail
+        self.calls = 0
+
+    def __call__(self, prompt):
+        self.calls += 1
+        time.sleep(self.latency_sec)
+        if self.fail:
+            raise RuntimeError("stub backend failure")
+        metrics = [line.strip() for line in prompt.splitlines() if line.strip().startswith('- ')]
+        return "Offline summary of the optimization run.\n\n" + "\n".join(metrics)
+
+# --- Summary service ---
+class SummaryService:
+    def __init__(self, backend, cache_dir=None, timeout_sec=DEFAULT_TIMEOUT_SEC, max_workers=2, max_cached=256):
+        self.backend = backend
+        self.cache_dir = cache_dir
+        self.timeout_sec = timeout_sec
+        self.max_cached = max_cached
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        # Prompt keys whose latest request failed, with the exception
+        self._failed = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='summary')
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def prompt_key(prompt):
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.txt")
+
+    def _remember(self, key, text):
+        with self._lock:
+            self._cache[key] = text
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    def cached(self, kpis):
+        key = self.prompt_key(build_summary_prompt(kpis))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        if self.cache_dir and os.path.exists(self._cache_path(key)):
+            with open(self._cache_path(key), encoding='utf-8') as f:
+                text = f.read()
+            self._remember(key, text)
+            return text
+        return None
+
+    def failure(self, kpis):
+        # The exception from the latest request for these KPIs, if it failed
+        with self._lock:
+            return self._failed.get(self.prompt_key(build_summary_prompt(kpis)))
+
+    def _generate(self, key, prompt):
+        try:
+            try:
+                text = self.backend(prompt)
+            except Exception as exc:
+                logger.exception("Summary backend failed")
+                with self._lock:
+                    self._failed[key] = exc
+                    while len(self._failed) > self.max_cached:
+                        self._failed.popitem(last=False)
+                raise
+            with self._lock:
+                self._failed.pop(key, None)
+            self._remember(key, text)
+            if self.cache_dir:
+                tmp_path = self._cache_path(key) + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(tmp_path, self._cache_path(key))
+            return text
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def submit(self, kpis):
+        # Start (or join) the background request for these KPIs
+        prompt = build_summary_prompt(kpis)
+        key = self.prompt_key(prompt)
+        with self._lock:
+            if key not in self._in_flight:
+                self._failed.pop(key, None)
+                self._in_flight[key] = self._executor.submit(self._generate, key, prompt)
+            return self._in_flight[key]
+
+    def summarize(self, kpis, timeout_sec=None):
+        # Returns (text, source) with source 'cache', 'llm', 'fallback' or
+        # 'error'. On timeout ('fallback') the request keeps running and lands
+        # in the cache for the next call with the same KPIs; if the backend
+        # failed ('error') the template text is all there will be.
+        text = self.cached(kpis)
+        if text is not None:
+            return text, 'cache'
+        future = self.submit(kpis)
+        try:
+            return future.result(timeout=self.timeout_sec if timeout_sec is None else timeout_sec), 'llm'
+        except TimeoutError:
+            return generate_summary_text(kpis), 'fallback'
+        except Exception:
+            # Already logged by the worker
+            return generate_summary_text(kpis), 'error'
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+if __name__ == '__main__':
+    import tempfile
+    from orchestration_utils import build_warehouse_pipeline
+
+    # Offline load test: many distinct KPI sets through a slow stub backend
+    pipeline = build_warehouse_pipeline()
+    kpi_sets = [pipeline.run(['kpis'], params={'data': {'seed': seed}})['kpis'] for seed in range(20)]
+    service = SummaryService(StubBackend(latency_sec=0.2), cache_dir=tempfile.mkdtemp(), timeout_sec=0.05, max_workers=8)
+
+    start = time.perf_counter()
+    sources = [service.summarize(kpis)[1] for kpis in kpi_sets]
+    print(f"Cold pass:  {time.perf_counter() - start:.2f}s, sources: {sorted(set(sources))}")
+    time.sleep(0.5)
+    start = time.perf_counter()
+    sources = [service.summarize(kpis)[1] for kpis in kpi_sets]
+    print(f"Warm pass:  {time.perf_counter() - start:.3f}s, sources: {sorted(set(sources))}")
+    print(f"Backend calls: {service.backend.calls}")
+    service.shutdown()
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from slotting_agent import RESERVE_LOCATION, assign_zone_locations, optimize_slotting, recommend_slotting
+
+def _skus(sides, demand):
+    return pd.DataFrame({
+        'Product_ID': [f"P{i}" for i in range(len(sides))],
+        'Daily_Demand': demand,
+        'Length_cm': sides, 'Width_cm': sides, 'Height_cm': sides,
+        'Weight_kg': [1.0] * len(sides),
+    })
+
+def _slots(volumes, travel=None):
+    return pd.DataFrame({
+        'Location_ID': [f"L{i}" for i in range(len(volumes))],
+        'Volume_cm3': volumes,
+        'Max_Weight_kg': [100.0] * len(volumes),
+        'Travel_Cost': np.arange(len(volumes), dtype='float64') if travel is None else travel,
+    })
+
+def test_assign_zone_locations_numbers_each_zone():
+    assert assign_zone_locations(['A', 'A', 'B', 'C', 'C']).tolist() == ['LOC_A01', 'LOC_A02', 'LOC_B01', 'LOC_C01', 'LOC_C02']
+
+def test_recommend_slotting_empty_frame():
+    df = pd.DataFrame({'Product_ID': pd.Series([], dtype=object), 'Daily_Demand': pd.Series([], dtype='int64'),
+                       'ABC_Category': pd.Series([], dtype=object)})
+    df_optimized = recommend_slotting(df)
+    assert len(df_optimized) == 0
+    assert df_optimized['New_Location'].dtype == object
+
+def test_block_loop_terminates_when_a_block_only_fits_beyond_its_window():
+    # The four big SKUs come first and only fit the last four slots
+    df = _skus([45] * 4 + [10] * 6, np.arange(100, 0, -10))
+    _, report = optimize_slotting(df, _slots([27_000] * 12 + [125_000] * 4), block_size=4, window_factor=2)
+    assert report['reserve'] == 0
+
+def test_leftovers_reach_any_free_slot_that_fits():
+    df_placed, _ = optimize_slotting(_skus([45], [100]), _slots([27_000] * 19 + [125_000]))
+    assert df_placed['New_Location'].tolist() == ['L19']
+
+def test_no_locations_sends_everything_to_reserve():
+    df_placed, report = optimize_slotting(_skus([10, 20], [5, 3]), _slots([]))
+    assert df_placed['New_Location'].tolist() == [RESERVE_LOCATION] * 2
+    assert report['reserve'] == 2
+
+def test_lower_bound_holds_when_reserve_undercuts_slots():
+    df = _skus([10] * 6, [60, 50, 40, 30, 20, 10])
+    for time_budget_sec in (60.0, 0.0):
+        df_placed, report = optimize_slotting(df, _slots([27_000] * 6), reserve_cost=2.5, time_budget_sec=time_budget_sec)
+        assert report['objective'] >= report['lower_bound'] - 1e-9
+        assert (df_placed['Travel_Cost'] <= 2.5).all()